@@ -1,17 +1,31 @@
 import asyncio
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from src.application.channel_manager import ChannelManager
 from src.bot.admin_handlers import admin_router
 from src.bot.handlers import channel_events_router
 from src.bot.middlewares.check_admin_middleware import AdminCheckMiddleware
 from src.infrastructure.models import Base
 from src.infrastructure.db import engine
+from src.infrastructure.http_client import HttpClient
 from src.services.news_source.feed_service import FeedService
+from src.services.news_source.cached_news_source import CachedNewsSource
+from src.services.news_source.feed_fetcher import MultiFeedFetcher
 from src.services.channel_service import ChannelService
-from src.services.message_service import MessageService
+from src.services.channel_registry import ChannelRegistry
+from src.services.message_service import MessageService, CatchUpPolicy
 from src.services.telegram_message_sender import TelegramMessageSender
-from src.infrastructure.repositories import ChannelRepository
+from src.services.queued_message_sender import QueuedMessageSender
+from src.infrastructure.repositories import ChannelRepository, RewriteCacheRepository, OutboxRepository
+from src.services.outbox_worker import OutboxWorkerPool
 from src.services.rewriter_service import DeepSeekTextRewriterService
+from src.services.cached_rewriter_service import CachedTextRewriterService
+from src.services.single_flight_rewriter_service import SingleFlightTextRewriterService
+from src.services.compacting_rewriter_service import CompactingTextRewriterService
+from src.services.text_compactor import TextCompactor
+from src.services.hedged_rewriter_service import HedgedTextRewriterService
+from src.services.extractive_rewriter_service import ExtractiveTextRewriterService
 from src.infrastructure.db import SessionLocal
 from src.services.news_scheduler import NewsScheduler
 from dotenv import load_dotenv
@@ -21,6 +35,8 @@ import os
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 API_KEY = os.getenv("API_KEY")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL")
 
 
 async def init_db():
@@ -32,28 +48,71 @@ async def main():
         raise ValueError("Environment variables are not set!")
     
     await init_db()
-    bot = Bot(token=BOT_TOKEN)
+    if TELEGRAM_API_URL:
+        bot = Bot(token=BOT_TOKEN, session=AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL)))
+    else:
+        bot = Bot(token=BOT_TOKEN)
     dp = Dispatcher()
-    feed_service = FeedService()
-    async with SessionLocal() as session:
-        repo = ChannelRepository(session)
+    http_client = HttpClient(limit=100, limit_per_host=10, dns_cache_ttl=300)
+    feed_source = FeedService(http_client)
+    feed_service = CachedNewsSource(feed_source, ttl_seconds=55, max_feeds=512)
+    message_sender = QueuedMessageSender(TelegramMessageSender(bot), global_rate=30, per_chat_rate=20 / 60)
+    outbox = OutboxWorkerPool(OutboxRepository(SessionLocal), message_sender, feed_service, workers=4)
+    news_scheduler: NewsScheduler | None = None
+    try:
+        repo = ChannelRepository(SessionLocal)
+        await repo.import_legacy_sent_links()
         channel_service = ChannelService(repo)
-        message_sender = TelegramMessageSender(bot)
-        rewrite_service = DeepSeekTextRewriterService(API_KEY)
-        message_service = MessageService(message_sender, channel_service, rewrite_service)
-        news_scheduler = NewsScheduler(channel_service, feed_service, message_service)
-        channel_manager = ChannelManager(channel_service, news_scheduler)
-        
+        registry = ChannelRegistry(channel_service)
+        await registry.load()
+        llm_rewrite_service = CompactingTextRewriterService(
+            SingleFlightTextRewriterService(
+                CachedTextRewriterService(
+                    DeepSeekTextRewriterService(API_KEY, http_client, base_url=OPENROUTER_BASE_URL),
+                    RewriteCacheRepository(SessionLocal),
+                    memory_size=1024,
+                    ttl_seconds=7 * 24 * 3600,
+                )
+            ),
+            TextCompactor(max_chars=2500),
+        )
+        rewrite_service = HedgedTextRewriterService(
+            llm_rewrite_service,
+            ExtractiveTextRewriterService(max_chars=1000),
+            sla_seconds=25,
+        )
+        feed_fetcher = MultiFeedFetcher(max_concurrent=32, max_per_host=4, deadline_seconds=20)
+        message_service = MessageService(
+            message_sender,
+            channel_service,
+            rewrite_service,
+            feed_fetcher,
+            prefetch_rewrite_service=llm_rewrite_service,
+            outbox=outbox,
+            catch_up=CatchUpPolicy(max_items_per_tick=5, backlog_threshold=5),
+        )
+        news_scheduler = NewsScheduler(registry, feed_service, message_service)
+        channel_manager = ChannelManager(channel_service, news_scheduler, registry)
+
         dp.include_router(admin_router(channel_manager))
-        dp.include_router(channel_events_router(bot, channel_service))
-        
+        dp.include_router(channel_events_router(bot, channel_manager))
+
         await news_scheduler.schedule_all()
         news_scheduler.start()
-        
-        middleware = AdminCheckMiddleware(bot, channel_service)
+        outbox.start()
+
+        middleware = AdminCheckMiddleware(bot, registry)
         dp.message.middleware(middleware)
 
         await dp.start_polling(bot)
+    finally:
+        if news_scheduler is not None:
+            await news_scheduler.close()
+        await outbox.close()
+        await message_sender.close()
+        await http_client.close()
+        feed_source.close()
+        await bot.session.close()
 
 if __name__ == '__main__':
     asyncio.run(main())
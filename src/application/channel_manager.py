@@ -1,27 +1,36 @@
+from src.services.channel_registry import ChannelRegistry
 from src.services.channel_service import ChannelService
 from src.services.news_scheduler import NewsScheduler
 from src.dto.channel_dto import ChannelDTO
 
 
 class ChannelManager:
-    def __init__(self, channel_service: ChannelService, news_scheduler: NewsScheduler):
+    def __init__(self, channel_service: ChannelService, news_scheduler: NewsScheduler, registry: ChannelRegistry):
         self.channel_service = channel_service
         self.news_scheduler = news_scheduler
+        self.registry = registry
+
+    def get_channel(self, channel_id: int) -> ChannelDTO | None:
+        return self.registry.get(channel_id)
+
+    def list_channels(self) -> list[ChannelDTO]:
+        return self.registry.all()
 
     async def add_channel(self, channel_dto: ChannelDTO):
         await self.channel_service.register_channel(channel_dto)
-        channel = await self.channel_service.get_channel(channel_dto.id)
-        if channel:
-            await self.news_scheduler.schedule_channel(channel)
+        await self.update_channel(channel_dto.id)
 
     async def remove_channel(self, channel_id: int):
         await self.channel_service.remove_channel(channel_id)
+        self.registry.remove(channel_id)
         self.news_scheduler.remove_channel_job(channel_id)
 
     async def update_channel(self, channel_id: int):
-        channel = await self.channel_service.get_channel(channel_id)
+        channel = await self.registry.refresh(channel_id)
         if channel:
             await self.news_scheduler.schedule_channel(channel)
+        else:
+            self.news_scheduler.remove_channel_job(channel_id)
 
     async def add_rss(self, channel_id: int, rss_url: str):
         ok = await self.channel_service.add_rss(channel_id, rss_url)
@@ -33,6 +42,7 @@ class ChannelManager:
         ok = await self.channel_service.remove_rss(channel_id, rss_url)
         if ok:
             await self.update_channel(channel_id)
+        return ok
 
     async def set_work_interval(self, channel_id: int, interval_minutes: int):
         await self.channel_service.set_work_interval(channel_id, interval_minutes)
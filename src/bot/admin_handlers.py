@@ -24,7 +24,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
 
         channel_id = data.get("channel_id")
         if channel_id:
-            channel = await channel_manager.channel_service.get_channel(channel_id)
+            channel = channel_manager.get_channel(channel_id)
             if channel:
                 text = await render_channel_info(channel)
                 await safe_edit(call, text, get_channel_kb(channel))
@@ -97,7 +97,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
 
     @router.callback_query(F.data == "list_channels")
     async def list_channels(call: CallbackQuery):
-        channels = await channel_manager.channel_service.get_all_channels()
+        channels = channel_manager.list_channels()
         if not channels:
             await safe_edit(call, "Каналов нет.", InlineKeyboardMarkup(
                 inline_keyboard=[[InlineKeyboardButton(text="Назад", callback_data="admin_menu")]]
@@ -131,7 +131,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         except Exception:
             await call.answer("Некорректный ID.", show_alert=True)
             return
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if not channel:
             await call.answer("Канал не найден.", show_alert=True)
             return
@@ -149,7 +149,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         except Exception:
             await call.answer("Некорректный ID.", show_alert=True)
             return
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if not channel:
             await call.answer("Канал не найден.", show_alert=True)
             return
@@ -157,7 +157,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
             await channel_manager.disable_channel(channel_id)
         else:
             await channel_manager.enable_channel(channel_id)
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if not channel:
             await call.answer("Канал не найден после изменения.", show_alert=True)
             return
@@ -204,7 +204,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         else:
             await message.answer("Ошибка при добавлении RSS или такая ссылка уже есть.")
         await state.clear()
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if channel:
             text = await render_channel_info(channel)
             await message.answer(text, reply_markup=get_channel_kb(channel))
@@ -220,7 +220,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         except Exception:
             await call.answer("Некорректный ID.", show_alert=True)
             return
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if not channel or not channel.rss_links:
             await call.answer("Нет RSS для удаления.", show_alert=True)
             return
@@ -247,7 +247,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         except Exception:
             await call.answer("Некорректный ID.", show_alert=True)
             return
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if not channel or idx >= len(channel.rss_links):
             await call.answer("Ошибка!", show_alert=True)
             return
@@ -257,7 +257,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
             await call.answer("RSS удалён.")
         else:
             await call.answer("Ошибка при удалении RSS.", show_alert=True)
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if channel:
             text = await render_channel_info(channel)
             if call.message:
@@ -304,7 +304,7 @@ def admin_router(channel_manager: ChannelManager) -> Router:
         await message.answer(f"Интервал обработки канала установлен на {interval} минут.")
         await state.clear()
 
-        channel = await channel_manager.channel_service.get_channel(channel_id)
+        channel = channel_manager.get_channel(channel_id)
         if channel:
             text = await render_channel_info(channel)
             await message.answer(text, reply_markup=get_channel_kb(channel))
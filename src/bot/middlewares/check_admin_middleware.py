@@ -4,26 +4,33 @@ from typing import Any
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Message, CallbackQuery, InlineQuery
 from aiogram.exceptions import TelegramAPIError
-from src.services.channel_service import ChannelService
+from src.services.channel_registry import ChannelRegistry
 from src.logging_config import logger
 
 logger = logger.getChild(__name__)
 
 class AdminCheckMiddleware(BaseMiddleware):
-    def __init__(self, bot, channel_service: ChannelService):
+    def __init__(self, bot, registry: ChannelRegistry):
         super().__init__()
         self.bot = bot
-        self.channel_service = channel_service
+        self.registry = registry
         self.channel_admins: dict[int, set[int]] = {}
+        self.channel_versions: dict[int, int | None] = {}
         self.last_update_time = 0
+        self.registry_version = -1
         self.cache_ttl = 300
 
-    async def update_admins(self):
+    async def update_admins(self, channel_ids: list[int] | None = None):
         try:
-            channels = await self.channel_service.get_all_channels()
-            new_channel_admins = {}
-            for channel in channels:
-                channel_id = channel.id
+            version = self.registry.version
+            full = channel_ids is None
+            if channel_ids is None:
+                channel_ids = [channel.id for channel in self.registry.all()]
+            new_channel_admins = {} if full else dict(self.channel_admins)
+            new_channel_versions = {} if full else dict(self.channel_versions)
+            for channel_id in channel_ids:
+                new_channel_versions[channel_id] = self.registry.version_of(channel_id)
+                new_channel_admins.pop(channel_id, None)
                 try:
                     admins = await self.bot.get_chat_administrators(channel_id)
                     admin_ids = {admin.user.id for admin in admins}
@@ -36,11 +43,25 @@ class AdminCheckMiddleware(BaseMiddleware):
                     logger.exception(f"Unexpected error for channel {channel_id}: {e}")
                     continue
             self.channel_admins = new_channel_admins
-            self.last_update_time = time.time()
-            logger.info(f"Admin cache updated: {len(new_channel_admins)} channels")
+            self.channel_versions = new_channel_versions
+            if full:
+                self.last_update_time = time.time()
+            self.registry_version = version
+            logger.info(f"Admin cache updated for {len(channel_ids)} of {len(new_channel_versions)} channels")
         except Exception as e:
             logger.exception("Failed to update channel admins")
 
+    async def update_changed_admins(self):
+        current = {channel.id for channel in self.registry.all()}
+        for channel_id in set(self.channel_versions) - current:
+            self.channel_versions.pop(channel_id, None)
+            self.channel_admins.pop(channel_id, None)
+        changed = [
+            channel_id for channel_id in current
+            if self.channel_versions.get(channel_id) != self.registry.version_of(channel_id)
+        ]
+        await self.update_admins(changed)
+
     def get_all_admin_ids(self) -> set[int]:
         all_ids = set()
         for ids in self.channel_admins.values():
@@ -49,8 +70,11 @@ class AdminCheckMiddleware(BaseMiddleware):
 
     async def is_admin(self, user_id: int) -> bool:
         now = time.time()
-        if (now - self.last_update_time) > self.cache_ttl or not self.channel_admins:
+        expired = (now - self.last_update_time) > self.cache_ttl
+        if expired or not self.channel_admins:
             await self.update_admins()
+        elif self.registry_version != self.registry.version:
+            await self.update_changed_admins()
         is_admin = user_id in self.get_all_admin_ids()
         return is_admin
 
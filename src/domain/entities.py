@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 
 @dataclass
 class Channel:
@@ -15,4 +16,18 @@ class News:
     title: str
     link: str
     description: str
-    image_link: bytes | None
+    image_url: str | None
+    published_at: datetime | None = None
+
+
+@dataclass
+class OutboxMessage:
+    channel_id: int
+    text: str
+    source_link: str
+    media_url: str | None
+    idempotency_key: str
+    group_key: str | None = None
+    id: int | None = None
+    attempts: int = 0
+    claim_token: str | None = None
@@ -53,3 +53,7 @@ class IChannelRepository(ABC):
     @abstractmethod
     async def get_last_news_sent_links(self, channel_id: int) -> list[str | None]:
         ...
+
+    @abstractmethod
+    async def filter_sent_links(self, channel_id: int, links: list[str]) -> set[str]:
+        ...
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from src.domain.entities import OutboxMessage
+
+
+class IOutboxRepository(ABC):
+    @abstractmethod
+    async def enqueue(self, message: OutboxMessage) -> bool:
+        ...
+
+    @abstractmethod
+    async def enqueue_many(self, messages: list[OutboxMessage]) -> int:
+        ...
+
+    @abstractmethod
+    async def claim(self, limit: int, lease_seconds: float) -> list[OutboxMessage]:
+        ...
+
+    @abstractmethod
+    async def mark_sending(self, message_ids: list[int], claim_token: str, lease_seconds: float) -> list[int]:
+        ...
+
+    @abstractmethod
+    async def mark_sent(self, message_id: int, claim_token: str) -> None:
+        ...
+
+    @abstractmethod
+    async def mark_failed(
+        self, message_id: int, claim_token: str, error: str, retry_in_seconds: float | None
+    ) -> None:
+        ...
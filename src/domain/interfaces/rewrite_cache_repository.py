@@ -0,0 +1,15 @@
+from abc import ABC, abstractmethod
+
+
+class IRewriteCacheRepository(ABC):
+    @abstractmethod
+    async def get(self, key: str, max_age_seconds: float) -> str | None:
+        ...
+
+    @abstractmethod
+    async def put(self, key: str, content: str) -> None:
+        ...
+
+    @abstractmethod
+    async def prune(self, max_entries: int, max_age_seconds: float) -> None:
+        ...
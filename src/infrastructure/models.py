@@ -1,5 +1,6 @@
+from datetime import datetime
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import JSON, BigInteger, String, Boolean, Integer
+from sqlalchemy import JSON, BigInteger, String, Boolean, Integer, DateTime, ForeignKey, Index, Text, func
 
 class Base(DeclarativeBase):
     pass
@@ -13,3 +14,49 @@ class ChannelModel(Base):
     enabled: Mapped[bool] = mapped_column(Boolean, default=True)
     work_interval_minutes: Mapped[int] = mapped_column(Integer, default=1)
     last_sent_links: Mapped[list[str | None]] = mapped_column(JSON, default=list, nullable=True)
+
+
+class SentNewsModel(Base):
+    __tablename__ = "sent_news"
+    __table_args__ = (
+        Index("ix_sent_news_channel_link_hash", "channel_id", "link_hash", unique=True),
+        Index("ix_sent_news_channel_id_id", "channel_id", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    channel_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("channels.id", ondelete="CASCADE"), nullable=False)
+    link_hash: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    link: Mapped[str] = mapped_column(String, nullable=False)
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RewriteCacheModel(Base):
+    __tablename__ = "rewrite_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+
+class OutboxModel(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_status_available_at", "status", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    channel_id: Mapped[int] = mapped_column(BigInteger, ForeignKey("channels.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    media_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    source_link: Mapped[str] = mapped_column(String, nullable=False)
+    group_key: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    claim_token: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,174 +1,221 @@
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+import hashlib
+import uuid
+from datetime import timedelta
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import and_, or_, select, update, delete, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.infrastructure.models import ChannelModel
-from src.domain.entities import Channel
+from src.infrastructure.models import ChannelModel, SentNewsModel, RewriteCacheModel, OutboxModel
+from src.domain.entities import Channel, OutboxMessage
 from src.domain.interfaces.channel_repository import IChannelRepository
+from src.domain.interfaces.outbox_repository import IOutboxRepository
+from src.domain.interfaces.rewrite_cache_repository import IRewriteCacheRepository
 from src.logging_config import logger
 
 logger = logger.getChild(__name__)
 
 
+def hash_link(link: str) -> int:
+    digest = hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+async def prune_sent_news(session: AsyncSession, channel_id: int, keep: int):
+    threshold = (
+        select(SentNewsModel.id)
+        .where(SentNewsModel.channel_id == channel_id)
+        .order_by(SentNewsModel.id.desc())
+        .offset(keep)
+        .limit(1)
+        .scalar_subquery()
+    )
+    await session.execute(
+        delete(SentNewsModel).where(
+            SentNewsModel.channel_id == channel_id,
+            SentNewsModel.id <= threshold,
+        )
+    )
+    logger.debug(f"Sent news history pruned for channel {channel_id}")
+
+
 class ChannelRepository(IChannelRepository):
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        sent_history_size: int = 5000,
+        prune_every: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.sent_history_size = sent_history_size
+        self.prune_every = prune_every
+        self._inserts_since_prune: dict[int, int] = {}
 
     async def get_by_id(self, channel_id: int) -> Channel | None:
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model is None:
-                logger.debug(f"Channel not found: {channel_id}")
-                return None
-
-            return Channel(
-                id=model.id,
-                title=model.title,
-                rss_links=list(model.rss_links),
-                enabled=model.enabled,
-                work_interval_minutes=model.work_interval_minutes,
-            )
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.id == channel_id)
+                )
+                model = result.scalar_one_or_none()
+                if model is None:
+                    logger.debug(f"Channel not found: {channel_id}")
+                    return None
+
+                return Channel(
+                    id=model.id,
+                    title=model.title,
+                    rss_links=list(model.rss_links),
+                    enabled=model.enabled,
+                    work_interval_minutes=model.work_interval_minutes,
+                )
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def get_all_channel(self) -> list[Channel]:
         try:
-            result = await self.session.execute(select(ChannelModel))
-            models = result.scalars().all()
-            return [
-                Channel(
-                    id=m.id,
-                    title=m.title,
-                    rss_links=list(m.rss_links),
-                    enabled=m.enabled,
-                    work_interval_minutes=m.work_interval_minutes,
-                )
-                for m in models
-            ]
+            async with self.session_factory() as session:
+                result = await session.execute(select(ChannelModel))
+                models = result.scalars().all()
+                return [
+                    Channel(
+                        id=m.id,
+                        title=m.title,
+                        rss_links=list(m.rss_links),
+                        enabled=m.enabled,
+                        work_interval_minutes=m.work_interval_minutes,
+                    )
+                    for m in models
+                ]
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def add_channel(self, channel: Channel) -> None:
         try:
-            model = ChannelModel(
-                id=channel.id,
-                title=channel.title,
-                rss_links=channel.rss_links,
-                enabled=channel.enabled,
-                work_interval_minutes=channel.work_interval_minutes,
-            )
-            self.session.add(model)
-            await self.session.commit()
-            logger.info(f"Channel created: {channel.id}")
+            async with self.session_factory() as session:
+                model = ChannelModel(
+                    id=channel.id,
+                    title=channel.title,
+                    rss_links=channel.rss_links,
+                    enabled=channel.enabled,
+                    work_interval_minutes=channel.work_interval_minutes,
+                )
+                session.add(model)
+                await session.commit()
+                logger.info(f"Channel created: {channel.id}")
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def del_channel(self, channel_id: int):
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model:
-                await self.session.delete(model)
-                await self.session.commit()
-                logger.info(f"Channel deleted: {channel_id}")
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.id == channel_id)
+                )
+                model = result.scalar_one_or_none()
+                if model:
+                    await session.delete(model)
+                    await session.commit()
+                    logger.info(f"Channel deleted: {channel_id}")
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def set_title(self, channel_id: int, new_title: str) -> bool:
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model:
-                model.title = new_title
-                await self.session.commit()
-                logger.debug(f"Channel title updated: {channel_id} -> {new_title}")
-                return True
-            logger.debug(f"Channel not found for title update: {channel_id}")
-            return False
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.id == channel_id)
+                )
+                model = result.scalar_one_or_none()
+                if model:
+                    model.title = new_title
+                    await session.commit()
+                    logger.debug(f"Channel title updated: {channel_id} -> {new_title}")
+                    return True
+                logger.debug(f"Channel not found for title update: {channel_id}")
+                return False
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def add_rss(self, channel_id: int, rss_url: str) -> bool:
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model and rss_url not in model.rss_links:
-                model.rss_links.append(rss_url)
-                flag_modified(model, "rss_links")
-                await self.session.commit()
-                logger.debug(f"RSS added: {rss_url} -> {channel_id}")
-                return True
-            logger.debug(f"Failed to add RSS: {rss_url} -> {channel_id}")
-            return False
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.id == channel_id)
+                )
+                model = result.scalar_one_or_none()
+                if model and rss_url not in model.rss_links:
+                    model.rss_links.append(rss_url)
+                    flag_modified(model, "rss_links")
+                    await session.commit()
+                    logger.debug(f"RSS added: {rss_url} -> {channel_id}")
+                    return True
+                logger.debug(f"Failed to add RSS: {rss_url} -> {channel_id}")
+                return False
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def remove_rss(self, channel_id: int, rss_url: str) -> bool:
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model and rss_url in model.rss_links:
-                model.rss_links.remove(rss_url)
-                flag_modified(model, "rss_links")
-                await self.session.commit()
-                logger.debug(f"RSS removed: {rss_url} <- {channel_id}")
-                return True
-            logger.debug(f"Failed to remove RSS: {rss_url} <- {channel_id}")
-            return False
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.id == channel_id)
+                )
+                model = result.scalar_one_or_none()
+                if model and rss_url in model.rss_links:
+                    model.rss_links.remove(rss_url)
+                    flag_modified(model, "rss_links")
+                    await session.commit()
+                    logger.debug(f"RSS removed: {rss_url} <- {channel_id}")
+                    return True
+                logger.debug(f"Failed to remove RSS: {rss_url} <- {channel_id}")
+                return False
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def set_enabled(self, channel_id: int):
         try:
-            await self.session.execute(
-                update(ChannelModel)
-                .where(ChannelModel.id == channel_id)
-                .values(enabled=True)
-            )
-            await self.session.commit()
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(ChannelModel)
+                    .where(ChannelModel.id == channel_id)
+                    .values(enabled=True)
+                )
+                await session.commit()
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def set_disable(self, channel_id: int):
         try:
-            await self.session.execute(
-                update(ChannelModel)
-                .where(ChannelModel.id == channel_id)
-                .values(enabled=False)
-            )
-            await self.session.commit()
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(ChannelModel)
+                    .where(ChannelModel.id == channel_id)
+                    .values(enabled=False)
+                )
+                await session.commit()
         except SQLAlchemyError:
             logger.exception("Database error")
             raise
 
     async def set_work_interval(self, channel_id: int, interval_minutes: int):
         try:
-            await self.session.execute(
-                update(ChannelModel)
-                .where(ChannelModel.id == channel_id)
-                .values(work_interval_minutes=interval_minutes)
-            )
-            await self.session.commit()
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(ChannelModel)
+                    .where(ChannelModel.id == channel_id)
+                    .values(work_interval_minutes=interval_minutes)
+                )
+                await session.commit()
         except SQLAlchemyError:
             logger.exception(f"Database error on set_work_interval({channel_id})")
             raise
@@ -176,31 +223,33 @@ class ChannelRepository(IChannelRepository):
 
     async def get_work_interval(self, channel_id: int) -> int:
         try:
-            result = await self.session.execute(
-                select(ChannelModel.work_interval_minutes).where(ChannelModel.id == channel_id)
-            )
-            interval = result.scalar_one_or_none()
-            if interval is None:
-                logger.debug(f"No interval found for channel id={channel_id}")
-                return 0
-            return interval
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel.work_interval_minutes).where(ChannelModel.id == channel_id)
+                )
+                interval = result.scalar_one_or_none()
+                if interval is None:
+                    logger.debug(f"No interval found for channel id={channel_id}")
+                    return 0
+                return interval
         except SQLAlchemyError:
             logger.exception(f"DB error on get_work_interval({channel_id})")
             raise
 
-    async def add_last_news_link(self, channel_id: int, link: str, max_links: int = 200):
+    async def add_last_news_link(self, channel_id: int, link: str):
         try:
-            result = await self.session.execute(
-                select(ChannelModel).where(ChannelModel.id == channel_id)
-            )
-            model = result.scalar_one_or_none()
-            if model:
-                sent_links = list(model.last_sent_links) if model.last_sent_links else []
-                sent_links.append(link)
-                sent_links = sent_links[-max_links:]
-                model.last_sent_links = sent_links
-                flag_modified(model, "last_sent_links")
-                await self.session.commit()
+            async with self.session_factory() as session:
+                await session.execute(
+                    insert(SentNewsModel)
+                    .values(channel_id=channel_id, link_hash=hash_link(link), link=link)
+                    .on_conflict_do_nothing(index_elements=["channel_id", "link_hash"])
+                )
+                inserts = self._inserts_since_prune.get(channel_id, 0) + 1
+                if inserts >= self.prune_every:
+                    await prune_sent_news(session, channel_id, self.sent_history_size)
+                    inserts = 0
+                self._inserts_since_prune[channel_id] = inserts
+                await session.commit()
                 logger.debug(f"Last news link added: {link} -> {channel_id}")
         except SQLAlchemyError:
             logger.exception("Database error")
@@ -208,12 +257,326 @@ class ChannelRepository(IChannelRepository):
 
     async def get_last_news_sent_links(self, channel_id: int) -> list[str | None]:
         try:
-            result = await self.session.execute(
-                select(ChannelModel.last_sent_links).where(ChannelModel.id == channel_id)
-            )
-            links = result.scalar_one_or_none()
-            return links if links else []
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(SentNewsModel.link)
+                    .where(SentNewsModel.channel_id == channel_id)
+                    .order_by(SentNewsModel.id.desc())
+                    .limit(self.sent_history_size)
+                )
+                links: list[str | None] = list(result.scalars().all())
+                links.reverse()
+                return links
         except SQLAlchemyError:
             logger.exception(f"Database error on get_last_news_sent_links({channel_id})")
             raise
 
+    async def filter_sent_links(self, channel_id: int, links: list[str]) -> set[str]:
+        if not links:
+            return set()
+        by_hash = {hash_link(link): link for link in links}
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(SentNewsModel.link_hash).where(
+                        SentNewsModel.channel_id == channel_id,
+                        SentNewsModel.link_hash.in_(by_hash.keys()),
+                    )
+                )
+                return {by_hash[link_hash] for link_hash in result.scalars().all()}
+        except SQLAlchemyError:
+            logger.exception(f"Database error on filter_sent_links({channel_id})")
+            raise
+
+    async def import_legacy_sent_links(self):
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(ChannelModel).where(ChannelModel.last_sent_links.is_not(None))
+                )
+                for model in result.scalars().all():
+                    links = [link for link in model.last_sent_links or [] if link]
+                    if not links:
+                        continue
+                    await session.execute(
+                        insert(SentNewsModel)
+                        .values([
+                            {"channel_id": model.id, "link_hash": hash_link(link), "link": link}
+                            for link in dict.fromkeys(links)
+                        ])
+                        .on_conflict_do_nothing(index_elements=["channel_id", "link_hash"])
+                    )
+                    model.last_sent_links = []
+                    flag_modified(model, "last_sent_links")
+                    logger.info(f"Imported {len(links)} legacy sent links for channel {model.id}")
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception("Database error on import_legacy_sent_links")
+            raise
+
+
+class RewriteCacheRepository(IRewriteCacheRepository):
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def get(self, key: str, max_age_seconds: float) -> str | None:
+        try:
+            async with self.session_factory() as session:
+                result = await session.execute(
+                    select(RewriteCacheModel.content).where(
+                        RewriteCacheModel.key == key,
+                        RewriteCacheModel.created_at >= func.now() - timedelta(seconds=max_age_seconds),
+                    )
+                )
+                return result.scalar_one_or_none()
+        except SQLAlchemyError:
+            logger.exception(f"Database error on rewrite cache get({key})")
+            raise
+
+    async def put(self, key: str, content: str) -> None:
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    insert(RewriteCacheModel)
+                    .values(key=key, content=content)
+                    .on_conflict_do_update(
+                        index_elements=["key"],
+                        set_={"content": content, "created_at": func.now()},
+                    )
+                )
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception(f"Database error on rewrite cache put({key})")
+            raise
+
+    async def prune(self, max_entries: int, max_age_seconds: float) -> None:
+        threshold = (
+            select(RewriteCacheModel.created_at)
+            .order_by(RewriteCacheModel.created_at.desc())
+            .offset(max_entries)
+            .limit(1)
+            .scalar_subquery()
+        )
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    delete(RewriteCacheModel).where(
+                        RewriteCacheModel.created_at < func.now() - timedelta(seconds=max_age_seconds)
+                    )
+                )
+                await session.execute(
+                    delete(RewriteCacheModel).where(RewriteCacheModel.created_at <= threshold)
+                )
+                await session.commit()
+                logger.debug("Rewrite cache pruned")
+        except SQLAlchemyError:
+            logger.exception("Database error on rewrite cache prune")
+            raise
+
+
+class OutboxRepository(IOutboxRepository):
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        sent_history_size: int = 5000,
+        prune_every: int = 100,
+    ):
+        self.session_factory = session_factory
+        self.sent_history_size = sent_history_size
+        self.prune_every = prune_every
+        self._inserts_since_prune: dict[int, int] = {}
+
+    async def enqueue(self, message: OutboxMessage) -> bool:
+        return await self.enqueue_many([message]) == 1
+
+    async def enqueue_many(self, messages: list[OutboxMessage]) -> int:
+        if not messages:
+            return 0
+        try:
+            async with self.session_factory() as session:
+                enqueued = 0
+                for message in messages:
+                    result = await session.execute(
+                        insert(OutboxModel)
+                        .values(
+                            channel_id=message.channel_id,
+                            idempotency_key=message.idempotency_key,
+                            text=message.text,
+                            media_url=message.media_url,
+                            source_link=message.source_link,
+                            group_key=message.group_key,
+                            status="pending",
+                            attempts=0,
+                        )
+                        .on_conflict_do_nothing(index_elements=["idempotency_key"])
+                        .returning(OutboxModel.id)
+                    )
+                    message.id = result.scalar_one_or_none()
+                    if message.id is None:
+                        logger.debug(f"Outbox already holds {message.idempotency_key}")
+                        continue
+
+                    await session.execute(
+                        insert(SentNewsModel)
+                        .values(
+                            channel_id=message.channel_id,
+                            link_hash=hash_link(message.source_link),
+                            link=message.source_link,
+                        )
+                        .on_conflict_do_nothing(index_elements=["channel_id", "link_hash"])
+                    )
+                    enqueued += 1
+
+                channel_id = messages[0].channel_id
+                inserts = self._inserts_since_prune.get(channel_id, 0) + enqueued
+                if inserts >= self.prune_every:
+                    await prune_sent_news(session, channel_id, self.sent_history_size)
+                    inserts = 0
+                self._inserts_since_prune[channel_id] = inserts
+                await session.commit()
+
+                logger.debug(f"{enqueued} of {len(messages)} outbox message(s) enqueued for channel {channel_id}")
+                return enqueued
+        except SQLAlchemyError:
+            logger.exception(f"Database error on outbox enqueue({messages[0].channel_id})")
+            raise
+
+    async def claim(self, limit: int, lease_seconds: float) -> list[OutboxMessage]:
+        claimable = or_(
+            and_(OutboxModel.status == "pending", OutboxModel.available_at <= func.now()),
+            and_(OutboxModel.status == "claimed", OutboxModel.locked_until < func.now()),
+        )
+        try:
+            async with self.session_factory() as session:
+                # A send whose lease ran out may or may not have reached Telegram, so it is
+                # parked for review instead of being sent a second time.
+                result = await session.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.status == "sending", OutboxModel.locked_until < func.now())
+                    .values(status="ambiguous", locked_until=None, last_error="Lease expired during send")
+                    .returning(OutboxModel.id)
+                )
+                ambiguous = list(result.scalars().all())
+                if ambiguous:
+                    logger.warning(f"Outbox messages {ambiguous} expired mid-send, delivery unknown; not retried")
+
+                result = await session.execute(
+                    select(OutboxModel)
+                    .where(claimable)
+                    .order_by(OutboxModel.id)
+                    .limit(limit)
+                    .with_for_update(skip_locked=True)
+                )
+                models = list(result.scalars().all())
+                if not models:
+                    return []
+
+                group_keys = {m.group_key for m in models if m.group_key is not None}
+                if group_keys:
+                    # Claim the rest of any group cut off by the limit so it is published together.
+                    result = await session.execute(
+                        select(OutboxModel)
+                        .where(
+                            claimable,
+                            OutboxModel.group_key.in_(group_keys),
+                            OutboxModel.id.not_in([m.id for m in models]),
+                        )
+                        .order_by(OutboxModel.id)
+                        .with_for_update(skip_locked=True)
+                    )
+                    models.extend(result.scalars().all())
+                    models.sort(key=lambda m: m.id)
+
+                claim_token = uuid.uuid4().hex
+                await session.execute(
+                    update(OutboxModel)
+                    .where(OutboxModel.id.in_([m.id for m in models]))
+                    .values(
+                        status="claimed",
+                        attempts=OutboxModel.attempts + 1,
+                        locked_until=func.now() + timedelta(seconds=lease_seconds),
+                        claim_token=claim_token,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                messages = [
+                    OutboxMessage(
+                        channel_id=m.channel_id,
+                        text=m.text,
+                        source_link=m.source_link,
+                        media_url=m.media_url,
+                        idempotency_key=m.idempotency_key,
+                        group_key=m.group_key,
+                        id=m.id,
+                        attempts=m.attempts + 1,
+                        claim_token=claim_token,
+                    )
+                    for m in models
+                ]
+                await session.commit()
+                return messages
+        except SQLAlchemyError:
+            logger.exception("Database error on outbox claim")
+            raise
+
+    async def mark_sending(self, message_ids: list[int], claim_token: str, lease_seconds: float) -> list[int]:
+        try:
+            async with self.session_factory() as session:
+                # Only rows still held under this claim's unexpired lease move on; anything
+                # else has been, or may be, claimed by another worker.
+                result = await session.execute(
+                    update(OutboxModel)
+                    .where(
+                        OutboxModel.id.in_(message_ids),
+                        OutboxModel.status == "claimed",
+                        OutboxModel.claim_token == claim_token,
+                        OutboxModel.locked_until > func.now(),
+                    )
+                    .values(status="sending", locked_until=func.now() + timedelta(seconds=lease_seconds))
+                    .returning(OutboxModel.id)
+                )
+                owned = list(result.scalars().all())
+                await session.commit()
+                return owned
+        except SQLAlchemyError:
+            logger.exception(f"Database error on outbox mark_sending({message_ids})")
+            raise
+
+    async def mark_sent(self, message_id: int, claim_token: str) -> None:
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    delete(OutboxModel).where(OutboxModel.id == message_id, OutboxModel.claim_token == claim_token)
+                )
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception(f"Database error on outbox mark_sent({message_id})")
+            raise
+
+    async def mark_failed(
+        self, message_id: int, claim_token: str, error: str, retry_in_seconds: float | None
+    ) -> None:
+        if retry_in_seconds is None:
+            values = {"status": "failed", "locked_until": None, "last_error": error}
+        else:
+            values = {
+                "status": "pending",
+                "locked_until": None,
+                "last_error": error,
+                "available_at": func.now() + timedelta(seconds=retry_in_seconds),
+            }
+        try:
+            async with self.session_factory() as session:
+                await session.execute(
+                    update(OutboxModel)
+                    .where(
+                        OutboxModel.id == message_id,
+                        OutboxModel.claim_token == claim_token,
+                        OutboxModel.status.in_(["claimed", "sending"]),
+                    )
+                    .values(**values)
+                )
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception(f"Database error on outbox mark_failed({message_id})")
+            raise
@@ -0,0 +1,130 @@
+import hashlib
+from dataclasses import dataclass
+from cachetools import TTLCache
+
+from src.domain.interfaces.rewrite_cache_repository import IRewriteCacheRepository
+from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+@dataclass
+class RewriteCacheStats:
+    memory_hits: int = 0
+    persistent_hits: int = 0
+    misses: int = 0
+    persistent_errors: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return (self.memory_hits + self.persistent_hits) / lookups if lookups else 0.0
+
+
+class CachedTextRewriterService(ITextRewriterService):
+    def __init__(
+        self,
+        rewriter: ITextRewriterService,
+        store: IRewriteCacheRepository | None = None,
+        memory_size: int = 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_persistent_entries: int = 50_000,
+        prune_every: int = 500,
+    ):
+        self.rewriter = rewriter
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_persistent_entries = max_persistent_entries
+        self.prune_every = prune_every
+        self.stats = RewriteCacheStats()
+        self._memory: TTLCache[str, str] = TTLCache(maxsize=memory_size, ttl=ttl_seconds)
+        self._stores_since_prune = 0
+
+    def cache_namespace(self) -> str:
+        return self.rewriter.cache_namespace()
+
+    def cache_key(self, text: str) -> str:
+        payload = f"{self.cache_namespace()}\0{text}".encode("utf-8", "surrogatepass")
+        return hashlib.sha256(payload).hexdigest()
+
+    async def rewrite(self, text: str) -> str:
+        key = self.cache_key(text)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            self.stats.memory_hits += 1
+            logger.debug(f"Rewrite cache memory hit: {key}")
+            return cached
+
+        cached = await self._load(key)
+        if cached is not None:
+            self.stats.persistent_hits += 1
+            logger.debug(f"Rewrite cache persistent hit: {key}")
+            self._memory[key] = cached
+            return cached
+
+        self.stats.misses += 1
+        logger.info(f"Rewrite cache miss: {key}, stats: {self.stats}, hit ratio: {self.stats.hit_ratio:.2f}")
+        content = await self.rewriter.rewrite(text)
+        self._memory[key] = content
+        await self._save(key, content)
+        return content
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        results: dict[str, str] = {}
+        misses: dict[str, str] = {}
+        for text in texts:
+            key = self.cache_key(text)
+            if key in results or key in misses:
+                continue
+            cached = self._memory.get(key)
+            if cached is not None:
+                self.stats.memory_hits += 1
+                results[key] = cached
+                continue
+            cached = await self._load(key)
+            if cached is not None:
+                self.stats.persistent_hits += 1
+                self._memory[key] = cached
+                results[key] = cached
+                continue
+            self.stats.misses += 1
+            misses[key] = text
+
+        if misses:
+            logger.info(
+                f"Rewrite cache batch: {len(misses)} of {len(texts)} missed, stats: {self.stats}, "
+                f"hit ratio: {self.stats.hit_ratio:.2f}"
+            )
+            contents = await self.rewriter.rewrite_batch(list(misses.values()))
+            for key, content in zip(misses, contents):
+                self._memory[key] = content
+                results[key] = content
+                await self._save(key, content)
+
+        return [results[self.cache_key(text)] for text in texts]
+
+    async def _load(self, key: str) -> str | None:
+        if self.store is None:
+            return None
+        try:
+            return await self.store.get(key, self.ttl_seconds)
+        except Exception as e:
+            self.stats.persistent_errors += 1
+            logger.warning(f"Rewrite cache lookup failed: {repr(e)}")
+            return None
+
+    async def _save(self, key: str, content: str):
+        if self.store is None:
+            return
+        try:
+            await self.store.put(key, content)
+            self._stores_since_prune += 1
+            if self._stores_since_prune >= self.prune_every:
+                self._stores_since_prune = 0
+                await self.store.prune(self.max_persistent_entries, self.ttl_seconds)
+        except Exception as e:
+            self.stats.persistent_errors += 1
+            logger.warning(f"Rewrite cache store failed: {repr(e)}")
@@ -0,0 +1,54 @@
+from src.dto.channel_dto import ChannelDTO
+from src.services.channel_service import ChannelService
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+class ChannelRegistry:
+    def __init__(self, channel_service: ChannelService):
+        self.channel_service = channel_service
+        self.version = 0
+        self._channels: dict[int, ChannelDTO] = {}
+        self._versions: dict[int, int] = {}
+
+    async def load(self):
+        channels = await self.channel_service.get_all_channels()
+        self._channels.clear()
+        self._versions.clear()
+        for channel in channels:
+            self.put(channel)
+        logger.info(f"Channel registry loaded {len(channels)} channels at version {self.version}")
+
+    async def refresh(self, channel_id: int) -> ChannelDTO | None:
+        channel = await self.channel_service.get_channel(channel_id)
+        if channel is None:
+            self.remove(channel_id)
+            return None
+        self.put(channel)
+        return channel
+
+    def get(self, channel_id: int) -> ChannelDTO | None:
+        return self._channels.get(channel_id)
+
+    def all(self) -> list[ChannelDTO]:
+        return list(self._channels.values())
+
+    def version_of(self, channel_id: int) -> int | None:
+        return self._versions.get(channel_id)
+
+    def put(self, channel: ChannelDTO) -> int:
+        self.version += 1
+        self._channels[channel.id] = channel
+        self._versions[channel.id] = self.version
+        logger.debug(f"Channel ID={channel.id} stored in registry at version {self.version}")
+        return self.version
+
+    def remove(self, channel_id: int) -> bool:
+        if self._channels.pop(channel_id, None) is None:
+            return False
+        self._versions.pop(channel_id, None)
+        self.version += 1
+        logger.debug(f"Channel ID={channel_id} removed from registry at version {self.version}")
+        return True
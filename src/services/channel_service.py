@@ -109,3 +109,8 @@ class ChannelService:
         links = await self.repository.get_last_news_sent_links(channel_id)
         logger.debug(f"Retrieved sent links history for channel id={channel_id} ({len(links)} links)")
         return links
+
+    async def get_sent_links(self, channel_id: int, links: list[str]) -> set[str]:
+        sent = await self.repository.filter_sent_links(channel_id, links)
+        logger.debug(f"{len(sent)} of {len(links)} candidate links already sent to channel id={channel_id}")
+        return sent
@@ -0,0 +1,17 @@
+from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.services.text_compactor import TextCompactor
+
+
+class CompactingTextRewriterService(ITextRewriterService):
+    def __init__(self, rewriter: ITextRewriterService, compactor: TextCompactor):
+        self.rewriter = rewriter
+        self.compactor = compactor
+
+    def cache_namespace(self) -> str:
+        return self.rewriter.cache_namespace()
+
+    async def rewrite(self, text: str) -> str:
+        return await self.rewriter.rewrite(self.compactor.compact(text))
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        return await self.rewriter.rewrite_batch([self.compactor.compact(text) for text in texts])
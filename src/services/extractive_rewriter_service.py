@@ -0,0 +1,41 @@
+import re
+
+from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.services.text_compactor import BOILERPLATE, TextCompactor
+
+
+URL = re.compile(r"(https?://|www\.)\S+|t\.me/\S+", re.IGNORECASE)
+HASHTAG_OR_MENTION = re.compile(r"(?<!\w)[#@]\w+")
+MARKUP = re.compile(r"[*_`~]+|<[^>]+>")
+SPACES = re.compile(r"[ \t]+")
+
+
+class ExtractiveTextRewriterService(ITextRewriterService):
+    def __init__(self, max_chars: int = 1000):
+        self.max_chars = max_chars
+        self.compactor = TextCompactor(max_chars=max_chars, report_every=0)
+
+    def cache_namespace(self) -> str:
+        return f"extractive:{self.max_chars}"
+
+    async def rewrite(self, text: str) -> str:
+        title, _, body = text.partition("\n")
+        title = self._clean(title)
+        sentences = [self._clean(sentence) for sentence in self.compactor.sentences(body)]
+        sentences = [
+            sentence for sentence in sentences
+            if sentence and sentence != title and not BOILERPLATE.search(sentence)
+        ]
+
+        budget = self.max_chars - len(title) - 2
+        kept = self.compactor.select(sentences, budget) if sum(len(s) + 1 for s in sentences) > budget else sentences
+        body = " ".join(kept)
+
+        result = f"{title}\n\n{body}" if title and body else title or body
+        return result[:self.max_chars].strip()
+
+    def _clean(self, text: str) -> str:
+        text = URL.sub("", text)
+        text = HASHTAG_OR_MENTION.sub("", text)
+        text = MARKUP.sub("", text)
+        return SPACES.sub(" ", text).strip()
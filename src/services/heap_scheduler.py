@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import heapq
+import time
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+@dataclass
+class ScheduledJob:
+    key: Hashable
+    interval: float | None
+    next_run: float
+    version: int
+
+
+def phase_fraction(key: Hashable) -> float:
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class HeapScheduler:
+    def __init__(
+        self,
+        on_due: Callable[[list[Hashable]], None],
+        batch_window: float = 1.0,
+        jitter_fraction: float = 1.0,
+    ):
+        self.on_due = on_due
+        self.batch_window = batch_window
+        self.jitter_fraction = jitter_fraction
+        self._jobs: dict[Hashable, ScheduledJob] = {}
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._version = 0
+        self._wakeup = asyncio.Event()
+        self._runner: asyncio.Task | None = None
+        self.dispatched = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self.skipped_ticks = 0
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._jobs
+
+    def schedule(self, key: Hashable, interval: float | None, delay: float | None = None):
+        if delay is None:
+            delay = self._initial_delay(key, interval) if interval else 0.0
+        self._version += 1
+        job = ScheduledJob(key, interval, self._now() + delay, self._version)
+        self._jobs[key] = job
+        self._push(job)
+
+    def remove(self, key: Hashable) -> bool:
+        # Heap entries of removed jobs are dropped lazily when they reach the top.
+        return self._jobs.pop(key, None) is not None
+
+    def next_run_in(self, key: Hashable) -> float | None:
+        job = self._jobs.get(key)
+        if job is None:
+            return None
+        return max(0.0, job.next_run - self._now())
+
+    def start(self):
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    def _initial_delay(self, key: Hashable, interval: float) -> float:
+        # Pin each key to a stable phase within its interval so that runs are spread out
+        # instead of firing on aligned boundaries, and stay put across restarts.
+        phase = interval * (1 - self.jitter_fraction + self.jitter_fraction * phase_fraction(key))
+        return (phase - time.time()) % interval
+
+    def _push(self, job: ScheduledJob):
+        heapq.heappush(self._heap, (job.next_run, job.version, job.key))
+        self._wakeup.set()
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def _is_current(self, version: int, key: Hashable) -> bool:
+        job = self._jobs.get(key)
+        return job is not None and job.version == version
+
+    async def _run(self):
+        while True:
+            while self._heap and not self._is_current(self._heap[0][1], self._heap[0][2]):
+                heapq.heappop(self._heap)
+
+            now = self._now()
+            if not self._heap or self._heap[0][0] > now:
+                self._wakeup.clear()
+                timeout = self._heap[0][0] - now if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = []
+            horizon = now + self.batch_window
+            while self._heap and self._heap[0][0] <= horizon:
+                run_at, version, key = heapq.heappop(self._heap)
+                if not self._is_current(version, key):
+                    continue
+                due.append(key)
+                self._record_lag(max(0.0, now - run_at))
+                self._advance(self._jobs[key], now)
+
+            if due:
+                try:
+                    self.on_due(due)
+                except Exception:
+                    logger.exception(f"Failed to dispatch {len(due)} due job(s)")
+
+    def _record_lag(self, lag: float):
+        self.dispatched += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def _advance(self, job: ScheduledJob, now: float):
+        if job.interval is None:
+            del self._jobs[job.key]
+            return
+        job.next_run += job.interval
+        if job.next_run <= now:
+            skipped = int((now - job.next_run) // job.interval) + 1
+            self.skipped_ticks += skipped
+            job.next_run += skipped * job.interval
+        self._version += 1
+        job.version = self._version
+        self._push(job)
@@ -0,0 +1,71 @@
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+
+from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+@dataclass
+class HedgedRewrite:
+    texts: list[str]
+    path: str
+
+
+class HedgedTextRewriterService(ITextRewriterService):
+    def __init__(self, primary: ITextRewriterService, fallback: ITextRewriterService, sla_seconds: float = 25):
+        self.primary = primary
+        self.fallback = fallback
+        self.sla_seconds = sla_seconds
+        self.paths: Counter[str] = Counter()
+        self._background: set[asyncio.Future[list[str]]] = set()
+
+    def cache_namespace(self) -> str:
+        return self.primary.cache_namespace()
+
+    async def rewrite(self, text: str) -> str:
+        return (await self.rewrite_batch([text]))[0]
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        return (await self.rewrite_with_path(texts)).texts
+
+    async def rewrite_with_path(self, texts: list[str]) -> HedgedRewrite:
+        primary = asyncio.ensure_future(self.primary.rewrite_batch(texts))
+        try:
+            results = await asyncio.wait_for(asyncio.shield(primary), self.sla_seconds)
+            self._record("primary", len(texts))
+            return HedgedRewrite(results, "primary")
+        except asyncio.TimeoutError:
+            # On 3.11 this also catches a TimeoutError raised by the primary itself.
+            if primary.done():
+                reason = repr(primary.exception())
+            else:
+                reason = f"exceeded {self.sla_seconds}s SLA"
+                self._finish_in_background(primary)
+        except asyncio.CancelledError:
+            self._finish_in_background(primary)
+            raise
+        except Exception as e:
+            reason = repr(e)
+
+        logger.warning(f"Primary rewriter {reason}, using {type(self.fallback).__name__}")
+        results = await self.fallback.rewrite_batch(texts)
+        self._record("fallback", len(texts))
+        return HedgedRewrite(results, "fallback")
+
+    def _record(self, path: str, count: int):
+        self.paths[path] += count
+        logger.info(f"Rewrite of {count} text(s) produced by {path} path; totals: {dict(self.paths)}")
+
+    def _finish_in_background(self, future: asyncio.Future[list[str]]):
+        # Let the remote call finish so its result still reaches the caches.
+        self._background.add(future)
+        future.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, future: asyncio.Future[list[str]]):
+        self._background.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Background primary rewrite failed: {repr(future.exception())}")
@@ -3,4 +3,11 @@ from abc import ABC, abstractmethod
 class IMessageSender(ABC):
     @abstractmethod
     async def send_message(self, chat_id: int, text: str, attachments: bytes | None) -> None:
-        ...
\ No newline at end of file
+        ...
+
+    @abstractmethod
+    async def send_group(self, chat_id: int, items: list[tuple[str, bytes | None]]) -> None:
+        ...
+
+    def group_parts(self, items: list[tuple[str, bytes | None]]) -> list[list[int]]:
+        return [list(range(len(items)))]
@@ -1,7 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
 
 
 class ITextRewriterService(ABC):
     @abstractmethod
     async def rewrite(self, text: str) -> str:
-        ...
\ No newline at end of file
+        ...
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        return list(await asyncio.gather(*(self.rewrite(text) for text in texts)))
+
+    def cache_namespace(self) -> str:
+        return type(self).__name__
@@ -1,82 +1,245 @@
-from src.domain.entities import News
+import hashlib
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from src.domain.entities import News, OutboxMessage
 from src.dto.channel_dto import ChannelDTO
 from src.services.interfaces.message_sender import IMessageSender
 from src.services.channel_service import ChannelService
 from src.services.interfaces.text_rewriter import ITextRewriterService
 from src.services.news_source.news_source import NewsSource
+from src.services.news_source.feed_fetcher import MultiFeedFetcher
+from src.services.outbox_worker import OutboxWorkerPool
 from src.logging_config import logger
 
 logger = logger.getChild(__name__)
 
+_EPOCH = datetime.fromtimestamp(0, tz=timezone.utc)
+
+
+def outbox_key(channel_id: int, link: str) -> str:
+    return hashlib.sha256(f"{channel_id}:{link}".encode("utf-8")).hexdigest()
+
+
+def publication_order(news: News) -> tuple[bool, datetime]:
+    return news.published_at is None, news.published_at or _EPOCH
+
+
+@dataclass
+class CatchUpPolicy:
+    max_items_per_tick: int = 1
+    backlog_threshold: int = 0
+
+    def backlog_scan_limit(self) -> int:
+        if self.max_items_per_tick <= 1:
+            return 1
+        return max(self.max_items_per_tick, self.backlog_threshold + 1)
+
+    def items_for(self, backlog: int) -> int:
+        if self.max_items_per_tick <= 1 or backlog <= self.backlog_threshold:
+            return 1
+        return min(self.max_items_per_tick, backlog)
+
+
+@dataclass
+class ReadyMessage:
+    news: News
+    text: str
+    prepared_at: datetime
+
+
 class MessageService:
-    def __init__(self, message_sender: IMessageSender, channel_service: ChannelService, rewrite_service: ITextRewriterService):
+    def __init__(
+        self,
+        message_sender: IMessageSender,
+        channel_service: ChannelService,
+        rewrite_service: ITextRewriterService,
+        feed_fetcher: MultiFeedFetcher | None = None,
+        prefetch_rewrite_service: ITextRewriterService | None = None,
+        outbox: OutboxWorkerPool | None = None,
+        catch_up: CatchUpPolicy | None = None,
+        catch_up_overrides: dict[int, CatchUpPolicy] | None = None,
+    ):
         self.message_sender = message_sender
         self.channel_service = channel_service
         self.rewrite_service = rewrite_service
+        self.prefetch_rewrite_service = prefetch_rewrite_service or rewrite_service
+        self.feed_fetcher = feed_fetcher or MultiFeedFetcher()
+        self.outbox = outbox
+        self.catch_up = catch_up or CatchUpPolicy()
+        self.catch_up_overrides = catch_up_overrides or {}
+        self._ready: dict[int, ReadyMessage] = {}
+        self._generations: dict[int, int] = {}
 
-    async def send_one_news_to_channel(self, channel: ChannelDTO, feed_service: NewsSource):
-        logger.info(f"Start processing channel ID={channel.id}")
+    async def prefetch_next_news(self, channel: ChannelDTO, feed_service: NewsSource):
+        logger.info(f"Prefetching next news for channel ID={channel.id}")
+        generation = self._generations.get(channel.id, 0)
+        candidates, _ = await self._select_candidates(channel, feed_service, 1)
+        if not candidates:
+            self.invalidate_ready_message(channel.id)
+            return
 
-        all_news = []
-        for rss_url in channel.rss_links:
-            try:
-                logger.info(f"Fetching news from RSS feed: {rss_url}")
-                news = await feed_service.fetch_latest_news(rss_url)
-                logger.info(f"Fetched {len(news)} news items from {rss_url}")
-                all_news.extend(news)
-            except Exception as e:
-                logger.error(f"Failed to fetch news from {rss_url}: {repr(e)}", exc_info=True)
+        ready = self._ready.get(channel.id)
+        if ready is not None and ready.news == candidates[0]:
+            logger.debug(f"Ready message for channel ID={channel.id} is still current")
+            return
 
-        if not all_news:
-            logger.info(f"No news fetched for channel ID={channel.id}")
+        try:
+            rewritten = await self.prefetch_rewrite_service.rewrite(self._build_message(candidates[0]))
+        except Exception as e:
+            logger.error(f"Prefetch rewrite failed for channel ID={channel.id}: {repr(e)}")
             return
 
-        all_news.sort(key=lambda n: getattr(n, "published_at", "") or "", reverse=False)
-        logger.info(f"Total collected news items: {len(all_news)}")
+        if self._generations.get(channel.id, 0) != generation:
+            logger.info(f"Channel ID={channel.id} changed during prefetch, result dropped")
+            return
+        self._ready[channel.id] = ReadyMessage(
+            news=candidates[0],
+            text=rewritten,
+            prepared_at=datetime.now(timezone.utc)
+        )
+        logger.info(f"Prepared next news for channel ID={channel.id}: {candidates[0].link}")
+
+    async def warm_feeds(self, channels: list[ChannelDTO], feed_service: NewsSource):
+        usage = Counter(url for channel in channels for url in dict.fromkeys(channel.rss_links))
+        shared = [url for url, count in usage.items() if count > 1]
+        if not shared:
+            return
+        logger.info(f"Fetching {len(shared)} feeds shared by {len(channels)} due channels")
+        await self.feed_fetcher.fetch_all(feed_service, shared)
 
-        sent_links = await self.channel_service.get_last_sent_links(channel.id)
-        logger.info(f"Already sent links for channel ID={channel.id}: {sent_links}")
+    def invalidate_ready_message(self, channel_id: int):
+        self._generations[channel_id] = self._generations.get(channel_id, 0) + 1
+        if self._ready.pop(channel_id, None) is not None:
+            logger.debug(f"Ready message invalidated for channel ID={channel_id}")
 
-        next_news = None
-        for item in all_news:
-            if item.link not in sent_links:
-                next_news = item
-                logger.info(f"Found new news item to send: {item.link}")
-                break
+    def catch_up_policy(self, channel_id: int) -> CatchUpPolicy:
+        return self.catch_up_overrides.get(channel_id, self.catch_up)
+
+    async def send_one_news_to_channel(self, channel: ChannelDTO, feed_service: NewsSource):
+        logger.info(f"Start processing channel ID={channel.id}")
 
-        if not next_news:
+        policy = self.catch_up_policy(channel.id)
+        candidates, backlog = await self._select_candidates(channel, feed_service, policy.backlog_scan_limit())
+        ready = self._ready.pop(channel.id, None)
+        if not candidates:
             logger.info(f"No new news to send for channel ID={channel.id}")
             return
 
-        title = getattr(next_news, "title", "") or ""
-        description = getattr(next_news, "description", "") or ""
-        logger.debug(f"News title: {repr(title)}")
-        logger.debug(f"News description: {repr(description)}")
+        count = policy.items_for(backlog)
+        items = candidates[:count]
+        if count > 1:
+            logger.info(f"Channel ID={channel.id} is at least {backlog} items behind, catching up with {count} items")
+        else:
+            logger.info(f"Found new news item to send: {items[0].link} (published {items[0].published_at})")
 
-        message = f"{title}\n{description}"
-        logger.debug(f"Original message text:\n{message}")
+        texts = await self._rewrite(channel, items, ready)
+        if texts is None:
+            return
 
-        try:
-            rewritten_message = await self.rewrite_service.rewrite(message)
-            logger.info(f"Rewritten message text:\n{repr(rewritten_message)}")
-        except Exception as e:
-            logger.critical(f"Rewrite service failed: {repr(e)}", exc_info=True)
+        if self.outbox is not None:
+            await self._enqueue(channel, items, texts)
             return
 
+        images = [
+            await feed_service.fetch_image(item.image_url) if item.image_url else None
+            for item in items
+        ]
+
         try:
-            logger.info(f"Sending message to channel ID={channel.id}...")
-            await self.message_sender.send_message(
-                channel.id,
-                rewritten_message,
-                getattr(next_news, "image_link", None)
-            )
+            logger.info(f"Sending {len(items)} message(s) to channel ID={channel.id}...")
+            if len(items) == 1:
+                await self.message_sender.send_message(channel.id, texts[0], images[0])
+            else:
+                await self.message_sender.send_group(channel.id, list(zip(texts, images)))
             logger.info(f"Message successfully sent to channel ID={channel.id}")
         except Exception as e:
             logger.critical(f"Failed to send message: {repr(e)}", exc_info=True)
             return
 
+        for item in items:
+            try:
+                await self.channel_service.add_last_sent_links(channel.id, item.link)
+                logger.info(f"Added news link to sent history for channel ID={channel.id}")
+            except Exception as e:
+                logger.critical(f"Failed to save sent news link: {repr(e)}", exc_info=True)
+
+    async def _rewrite(
+        self, channel: ChannelDTO, items: list[News], ready: ReadyMessage | None
+    ) -> list[str] | None:
+        texts = []
+        if ready is not None and ready.news == items[0]:
+            texts.append(ready.text)
+            logger.info(f"Using message prepared at {ready.prepared_at} for channel ID={channel.id}")
+            if len(items) == 1:
+                return texts
+            items = items[1:]
+        elif ready is not None:
+            logger.info(f"Prepared message for {ready.news.link} is stale, rewriting inline")
+
+        messages = [self._build_message(item) for item in items]
+        logger.debug(f"Original message text:\n{messages[0]}")
+
         try:
-            await self.channel_service.add_last_sent_links(channel.id, next_news.link)
-            logger.info(f"Added news link to sent history for channel ID={channel.id}")
+            rewritten = await self.rewrite_service.rewrite_batch(messages)
         except Exception as e:
-            logger.critical(f"Failed to save sent news link: {repr(e)}", exc_info=True)
+            logger.critical(f"Rewrite service failed: {repr(e)}", exc_info=True)
+            return None
+
+        texts.extend(rewritten)
+        logger.info(f"Rewritten message text:\n{repr(texts[0])}")
+        return texts
+
+    async def _enqueue(self, channel: ChannelDTO, items: list[News], texts: list[str]):
+        keys = [outbox_key(channel.id, item.link) for item in items]
+        group_key = keys[0] if len(items) > 1 else None
+        messages = [
+            OutboxMessage(
+                channel_id=channel.id,
+                text=text,
+                source_link=item.link,
+                media_url=item.image_url,
+                idempotency_key=key,
+                group_key=group_key,
+            )
+            for item, text, key in zip(items, texts, keys)
+        ]
+        try:
+            enqueued = await self.outbox.enqueue(messages)
+            logger.info(f"Queued {enqueued} of {len(messages)} news item(s) for channel ID={channel.id}")
+        except Exception as e:
+            logger.critical(f"Failed to queue news for channel ID={channel.id}: {repr(e)}", exc_info=True)
+
+    def _build_message(self, news: News) -> str:
+        title = news.title or ""
+        description = news.description or ""
+        logger.debug(f"News title: {repr(title)}")
+        logger.debug(f"News description: {repr(description)}")
+        return f"{title}\n{description}"
+
+    async def _select_candidates(
+        self, channel: ChannelDTO, feed_service: NewsSource, limit: int
+    ) -> tuple[list[News], int]:
+        # Stops after `limit` unsent items, so the backlog it reports is capped at `limit`.
+        feeds = await self.feed_fetcher.fetch_all(feed_service, channel.rss_links)
+        links = [item.link for news in feeds.values() for item in news]
+
+        if not links:
+            logger.info(f"No news fetched for channel ID={channel.id}")
+            return [], 0
+
+        logger.info(f"Total collected news items: {len(links)}")
+
+        sent_links = await self.channel_service.get_sent_links(channel.id, links)
+        logger.info(f"Already sent {len(sent_links)} of {len(links)} links for channel ID={channel.id}")
+
+        ordered_feeds = [sorted(news, key=publication_order) for news in feeds.values()]
+        unsent: dict[str, News] = {}
+        for item in heapq.merge(*ordered_feeds, key=publication_order):
+            if item.link not in sent_links:
+                unsent.setdefault(item.link, item)
+                if len(unsent) >= limit:
+                    break
+        return list(unsent.values()), len(unsent)
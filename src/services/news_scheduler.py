@@ -1,8 +1,10 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import asyncio
+from collections.abc import Hashable
+from dataclasses import dataclass
 
 from src.dto.channel_dto import ChannelDTO
-from src.services.channel_service import ChannelService
+from src.services.channel_registry import ChannelRegistry
+from src.services.heap_scheduler import HeapScheduler
 from src.services.message_service import MessageService
 from src.services.news_source.news_source import NewsSource
 from src.logging_config import logger
@@ -10,58 +12,242 @@ from src.logging_config import logger
 
 logger = logger.getChild(__name__)
 
+SEND = "send"
+PREFETCH = "prefetch"
+
+
+@dataclass
+class SchedulerStats:
+    channels: int
+    in_flight: int
+    runs: int
+    overlaps: int
+    coalesced: int
+    skipped: int
+    disabled_skipped: int
+    max_duration_seconds: float
+    avg_lag_seconds: float
+    max_lag_seconds: float
+
+
 class NewsScheduler:
-    def __init__(self, channel_service: ChannelService, feed_service: NewsSource, message_service: MessageService):
-        self.channel_service = channel_service
+    def __init__(
+        self,
+        registry: ChannelRegistry,
+        feed_service: NewsSource,
+        message_service: MessageService,
+        prefetch_lead_seconds: float = 45,
+        batch_window_seconds: float = 1,
+        jitter_fraction: float = 1,
+        coalesce_missed: bool = True,
+        report_every: int = 100,
+    ):
+        self.registry = registry
         self.feed_service = feed_service
         self.message_service = message_service
-        self.scheduler = AsyncIOScheduler()
-        self.loop = asyncio.get_event_loop()
+        self.prefetch_lead_seconds = prefetch_lead_seconds
+        self.scheduler = HeapScheduler(self._on_due, batch_window=batch_window_seconds, jitter_fraction=jitter_fraction)
+        self.coalesce_missed = coalesce_missed
+        self.report_every = report_every
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._prefetches: dict[int, asyncio.Task[None]] = {}
+        self._in_flight: set[int] = set()
+        self._missed: set[int] = set()
+        self.runs = 0
+        self.overlaps = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.disabled_skipped = 0
+        self.max_duration_seconds = 0.0
 
     async def send_news_for_channel(self, channel: ChannelDTO):
+        started_at = asyncio.get_running_loop().time()
         try:
             await self.message_service.send_one_news_to_channel(channel, self.feed_service)
         except Exception:
             logger.exception(f"Failed to send news for channel ID={channel.id}")
+        finally:
+            self._finish_run(channel.id, asyncio.get_running_loop().time() - started_at)
+
+        current = self._active_channel(channel.id)
+        if channel.id in self._missed and current is not None:
+            self._missed.discard(channel.id)
+            logger.info(f"Running coalesced missed tick for channel ID={channel.id}")
+            self._in_flight.add(channel.id)
+            self._spawn(self.send_news_for_channel(current))
+        else:
+            self._missed.discard(channel.id)
+            if current is not None:
+                self._schedule_prefetch(current)
+
+    async def send_news_for_channels(self, channels: list[ChannelDTO]):
+        if len(channels) > 1:
+            logger.info(f"Running {len(channels)} channels due together")
+            try:
+                await self.message_service.warm_feeds(channels, self.feed_service)
+            except Exception:
+                logger.exception("Failed to warm shared feeds")
+        await asyncio.gather(*(self.send_news_for_channel(channel) for channel in channels))
+
+    async def prefetch_for_channel(self, channel: ChannelDTO):
+        try:
+            await self.message_service.prefetch_next_news(channel, self.feed_service)
+        except Exception:
+            logger.exception(f"Failed to prefetch news for channel ID={channel.id}")
 
     async def schedule_all(self):
         try:
-            channels = await self.channel_service.get_all_channels()
-            for channel in channels:
+            for channel in self.registry.all():
                 await self.schedule_channel(channel)
         except Exception:
             logger.exception("Failed to schedule all channels")
 
     async def schedule_channel(self, channel: ChannelDTO):
+        self._cancel_prefetch(channel.id)
+        self.message_service.invalidate_ready_message(channel.id)
+        if not channel.enabled:
+            self._unschedule(channel.id)
+            logger.info(f"Channel ID={channel.id} is disabled, not scheduled")
+            return
         try:
-            self.scheduler.add_job(
-                self._run_async_job,
-                "interval",
-                minutes=channel.work_interval_minutes,
-                args=[channel],
-                id=f"news_job_{channel.id}",
-                replace_existing=True
+            self.scheduler.schedule((SEND, channel.id), channel.work_interval_minutes * 60)
+            self._schedule_prefetch(channel)
+            logger.debug(
+                f"Channel ID={channel.id} scheduled every {channel.work_interval_minutes} min, "
+                f"next run in {self.scheduler.next_run_in((SEND, channel.id)):.0f}s"
             )
         except Exception:
             logger.exception(f"Failed to schedule job for channel ID={channel.id}")
 
     def start(self):
-        logger.info("Starting news scheduler")
+        logger.info(f"Starting news scheduler with {len(self.scheduler)} jobs")
         try:
             self.scheduler.start()
         except Exception:
             logger.critical("Failed to start news scheduler", exc_info=True)
 
+    def stats(self) -> SchedulerStats:
+        scheduler = self.scheduler
+        return SchedulerStats(
+            channels=len(self.registry.all()),
+            in_flight=len(self._in_flight),
+            runs=self.runs,
+            overlaps=self.overlaps,
+            coalesced=self.coalesced,
+            skipped=self.skipped + scheduler.skipped_ticks,
+            disabled_skipped=self.disabled_skipped,
+            max_duration_seconds=self.max_duration_seconds,
+            avg_lag_seconds=scheduler.total_lag / scheduler.dispatched if scheduler.dispatched else 0.0,
+            max_lag_seconds=scheduler.max_lag,
+        )
+
+    async def close(self):
+        await self.scheduler.close()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info("News scheduler stopped")
+
     def remove_channel_job(self, channel_id: int):
-        job_id = f"news_job_{channel_id}"
-        try:
-            self.scheduler.remove_job(job_id)
+        self.message_service.invalidate_ready_message(channel_id)
+        if self._unschedule(channel_id):
             logger.info(f"Removed job for channel ID={channel_id}")
-        except Exception:
-            logger.warning(f"Failed to remove job for channel ID={channel_id}", exc_info=True)
+        else:
+            logger.warning(f"Failed to remove job for channel ID={channel_id}: not scheduled")
 
-    def _run_async_job(self, channel: ChannelDTO):
-        try:
-            asyncio.run_coroutine_threadsafe(self.send_news_for_channel(channel), self.loop)
-        except Exception:
-            logger.critical(f"Failed to run async job for channel ID={channel.id}", exc_info=True)
+    def _on_due(self, keys: list[Hashable]):
+        due = []
+        for kind, channel_id in keys:
+            if kind != SEND:
+                continue
+            channel = self._active_channel(channel_id)
+            if channel is None:
+                continue
+            if channel_id in self._in_flight:
+                self._on_overlap(channel_id)
+                continue
+            self._in_flight.add(channel_id)
+            due.append(channel)
+        if due:
+            self._spawn(self.send_news_for_channels(due))
+
+        for kind, channel_id in keys:
+            if kind != PREFETCH or channel_id in self._in_flight:
+                continue
+            channel = self._active_channel(channel_id)
+            if channel is not None:
+                self._spawn_prefetch(channel)
+
+    def _active_channel(self, channel_id: int) -> ChannelDTO | None:
+        channel = self.registry.get(channel_id)
+        if channel is None:
+            self._unschedule(channel_id)
+            return None
+        if not channel.enabled:
+            self.disabled_skipped += 1
+            logger.debug(f"Channel ID={channel_id} is disabled, skipping tick")
+            return None
+        return channel
+
+    def _unschedule(self, channel_id: int) -> bool:
+        self._cancel_prefetch(channel_id)
+        self.scheduler.remove((PREFETCH, channel_id))
+        self._missed.discard(channel_id)
+        return self.scheduler.remove((SEND, channel_id))
+
+    def _on_overlap(self, channel_id: int):
+        self.overlaps += 1
+        if not self.coalesce_missed:
+            self.skipped += 1
+            logger.warning(f"Channel ID={channel_id} is still running, skipping this tick")
+        elif channel_id in self._missed:
+            self.coalesced += 1
+            logger.warning(f"Channel ID={channel_id} is still running, tick merged into the pending run")
+        else:
+            self._missed.add(channel_id)
+            logger.warning(f"Channel ID={channel_id} is still running, tick deferred until it finishes")
+
+    def _finish_run(self, channel_id: int, duration: float):
+        self._in_flight.discard(channel_id)
+        self.runs += 1
+        self.max_duration_seconds = max(self.max_duration_seconds, duration)
+        if self.report_every and self.runs % self.report_every == 0:
+            stats = self.stats()
+            logger.info(
+                f"Scheduler: {stats.runs} runs over {stats.channels} channels, {stats.in_flight} in flight, "
+                f"{stats.overlaps} overlapping ticks ({stats.coalesced} coalesced, {stats.skipped} skipped), "
+                f"lag avg {stats.avg_lag_seconds:.2f}s max {stats.max_lag_seconds:.2f}s, "
+                f"longest run {stats.max_duration_seconds:.1f}s"
+            )
+
+    def _spawn(self, coroutine) -> asyncio.Task[None]:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _spawn_prefetch(self, channel: ChannelDTO):
+        self._cancel_prefetch(channel.id)
+        task = self._spawn(self.prefetch_for_channel(channel))
+        self._prefetches[channel.id] = task
+        task.add_done_callback(lambda _: self._forget_prefetch(channel.id, task))
+
+    def _forget_prefetch(self, channel_id: int, task: asyncio.Task[None]):
+        if self._prefetches.get(channel_id) is task:
+            del self._prefetches[channel_id]
+
+    def _cancel_prefetch(self, channel_id: int):
+        task = self._prefetches.pop(channel_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            logger.debug(f"Cancelled running prefetch for channel ID={channel_id}")
+
+    def _schedule_prefetch(self, channel: ChannelDTO):
+        next_run = self.scheduler.next_run_in((SEND, channel.id))
+        if next_run is None:
+            return
+        delay = next_run - self.prefetch_lead_seconds
+        if delay <= 0:
+            self.scheduler.remove((PREFETCH, channel.id))
+            return
+        self.scheduler.schedule((PREFETCH, channel.id), None, delay=delay)
@@ -0,0 +1,51 @@
+import asyncio
+from cachetools import TTLCache
+
+from src.domain.entities import News
+from src.services.news_source.news_source import NewsSource
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+class CachedNewsSource(NewsSource):
+    def __init__(self, source: NewsSource, ttl_seconds: float = 60, max_feeds: int = 512):
+        self.source = source
+        self._cache: TTLCache[str, list[News]] = TTLCache(maxsize=max_feeds, ttl=ttl_seconds)
+        self._in_flight: dict[str, asyncio.Task[list[News]]] = {}
+
+    async def fetch_latest_news(self, feed_url: str) -> list[News]:
+        news = self._cache.get(feed_url)
+        if news is not None:
+            logger.debug(f"Feed cache hit: {feed_url}")
+            return list(news)
+
+        task = self._in_flight.get(feed_url)
+        if task is None:
+            logger.debug(f"Feed cache miss: {feed_url}")
+            task = asyncio.ensure_future(self._load(feed_url))
+            self._in_flight[feed_url] = task
+            task.add_done_callback(lambda t: self._on_loaded(feed_url, t))
+        else:
+            logger.debug(f"Joining in-flight fetch: {feed_url}")
+
+        news = await asyncio.shield(task)
+        return list(news)
+
+    async def fetch_image(self, image_url: str) -> bytes | None:
+        return await self.source.fetch_image(image_url)
+
+    async def _load(self, feed_url: str) -> list[News]:
+        news = await self.source.fetch_latest_news(feed_url)
+        self._cache[feed_url] = news
+        return news
+
+    def _on_loaded(self, feed_url: str, task: asyncio.Task[list[News]]):
+        if self._in_flight.get(feed_url) is task:
+            del self._in_flight[feed_url]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Feed fetch failed, nothing cached for: {feed_url}")
+
+    def invalidate(self, feed_url: str) -> None:
+        self._cache.pop(feed_url, None)
@@ -0,0 +1,147 @@
+import hashlib
+import threading
+from html.parser import HTMLParser
+from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EntitySubstitution
+from cachetools import LRUCache
+
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+# Strings inside these tags are not part of BeautifulSoup's get_text() output.
+SKIPPED_TEXT_TAGS = frozenset({"script", "style"})
+# Tags whose text BeautifulSoup handles with tree semantics the fast parser
+# does not reproduce; descriptions containing them take the slow path.
+SOUP_ONLY_TAGS = ("<rt", "<rp", "<template")
+
+
+class _TextAndImageParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts: list[str] = []
+        self.img_url: str | None = None
+        self._img_found = False
+        self._skip_depth = 0
+        self._data: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        self._end_data()
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+        elif tag == "img" and not self._img_found:
+            self._img_found = True
+            attributes = dict(attrs)
+            if "src" in attributes:
+                self.img_url = attributes["src"] or ""
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, str | None]]):
+        if tag in SKIPPED_TEXT_TAGS:
+            self._end_data()
+            return
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str):
+        self._end_data()
+        if tag in SKIPPED_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data: str):
+        if not self._skip_depth:
+            self._data.append(data)
+
+    def handle_charref(self, name: str):
+        if name[:1] in ("x", "X"):
+            code = int(name[1:], 16)
+        else:
+            code = int(name)
+
+        data = None
+        if code < 256:
+            try:
+                data = bytes([code]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(code)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name: str):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f"&{name}")
+
+    def handle_comment(self, data: str):
+        self._end_data()
+
+    def handle_decl(self, decl: str):
+        self._end_data()
+
+    def handle_pi(self, data: str):
+        self._end_data()
+
+    def unknown_decl(self, data: str):
+        self._end_data()
+        if data.upper().startswith("CDATA["):
+            self.handle_data(data[len("CDATA["):])
+            self._end_data()
+
+    def close(self):
+        super().close()
+        self._end_data()
+
+    def _end_data(self):
+        if not self._data:
+            return
+        text = "".join(self._data).strip()
+        self._data.clear()
+        if text:
+            self.parts.append(text)
+
+
+class DescriptionParser:
+    def __init__(self, cache_size: int = 4096):
+        self._cache: LRUCache[bytes, tuple[str, str | None]] = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def parse(self, description: str) -> tuple[str, str | None]:
+        key = hashlib.blake2b(description.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._extract(description)
+        with self._lock:
+            self._cache[key] = result
+        return result
+
+    def _extract(self, description: str) -> tuple[str, str | None]:
+        if "<" not in description and "&" not in description:
+            return description.strip(), None
+
+        lowered = description.lower()
+        if any(tag in lowered for tag in SOUP_ONLY_TAGS):
+            return self._extract_with_soup(description)
+
+        try:
+            parser = _TextAndImageParser()
+            parser.feed(description)
+            parser.close()
+            return "\n".join(parser.parts), parser.img_url
+        except Exception as e:
+            logger.debug(f"Fast description parsing failed, falling back to BeautifulSoup: {repr(e)}")
+            return self._extract_with_soup(description)
+
+    def _extract_with_soup(self, description: str) -> tuple[str, str | None]:
+        soup = BeautifulSoup(description, "html.parser")
+        text = soup.get_text(separator="\n", strip=True)
+        img_tag = soup.find("img")
+        img_url = img_tag.get("src") if isinstance(img_tag, Tag) else None
+        if not isinstance(img_url, str):
+            img_url = None
+        return text, img_url
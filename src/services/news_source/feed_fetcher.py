@@ -0,0 +1,65 @@
+import asyncio
+from collections import Counter
+from urllib.parse import urlparse
+
+from src.domain.entities import News
+from src.services.news_source.news_source import NewsSource
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+class MultiFeedFetcher:
+    def __init__(self, max_concurrent: int = 32, max_per_host: int = 4, deadline_seconds: float = 20):
+        self.max_per_host = max_per_host
+        self.deadline_seconds = deadline_seconds
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._host_users: Counter[str] = Counter()
+
+    async def fetch_all(self, feed_service: NewsSource, feed_urls: list[str]) -> dict[str, list[News]]:
+        tasks = {
+            url: asyncio.create_task(self._fetch_one(feed_service, url))
+            for url in dict.fromkeys(feed_urls)
+        }
+        if not tasks:
+            return {}
+
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=self.deadline_seconds)
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        results = {}
+        for url, task in tasks.items():
+            if task in pending:
+                logger.warning(f"Feed fetch exceeded {self.deadline_seconds}s deadline: {url}")
+                continue
+            error = task.exception()
+            if error is not None:
+                logger.error(f"Failed to fetch news from {url}: {repr(error)}", exc_info=error)
+                continue
+            results[url] = task.result()
+        return results
+
+    async def _fetch_one(self, feed_service: NewsSource, feed_url: str) -> list[News]:
+        host = urlparse(feed_url).hostname or ""
+        host_semaphore = self._host_semaphores.get(host)
+        if host_semaphore is None:
+            host_semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        self._host_users[host] += 1
+
+        try:
+            async with host_semaphore, self._semaphore:
+                logger.info(f"Fetching news from RSS feed: {feed_url}")
+                news = await feed_service.fetch_latest_news(feed_url)
+                logger.info(f"Fetched {len(news)} news items from {feed_url}")
+                return news
+        finally:
+            # Forget idle hosts so the table only holds hosts with fetches in progress.
+            self._host_users[host] -= 1
+            if not self._host_users[host]:
+                del self._host_users[host]
+                del self._host_semaphores[host]
@@ -1,22 +1,128 @@
-from importlib.metadata import distribution
+import asyncio
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 import feedparser
 from typing import cast
 from feedparser.util import FeedParserDict
-from bs4 import BeautifulSoup, Tag
 import aiohttp
+from cachetools import LRUCache
 
 from src.domain.entities import News
+from src.infrastructure.http_client import HttpClient
 from src.services.news_source.news_source import NewsSource
+from src.services.news_source.description_parser import DescriptionParser
 from src.logging_config import logger
 
 
 logger = logger.getChild(__name__)
 
 
+@dataclass
+class FeedState:
+    etag: str | None = None
+    last_modified: str | None = None
+    watermark_published: datetime | None = None
+    news: list[tuple[str, News]] = field(default_factory=list)
+
+
 class FeedService(NewsSource):
+    def __init__(
+        self,
+        http_client: HttpClient,
+        request_timeout: float = 15,
+        connect_timeout: float = 5,
+        max_feed_bytes: int = 5 * 1024 * 1024,
+        parse_workers: int = 4,
+        image_timeout: float = 5,
+        max_image_bytes: int = 10 * 1024 * 1024,
+        image_cache_bytes: int = 32 * 1024 * 1024,
+        max_tracked_feeds: int = 1024,
+        description_cache_size: int = 4096,
+    ):
+        self.http_client = http_client
+        self.timeout = aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout)
+        self.max_feed_bytes = max_feed_bytes
+        self._executor = ThreadPoolExecutor(max_workers=parse_workers, thread_name_prefix="feed-parse")
+        self.image_timeout = aiohttp.ClientTimeout(total=image_timeout)
+        self.max_image_bytes = max_image_bytes
+        self._image_cache: LRUCache[str, bytes] = LRUCache(maxsize=image_cache_bytes, getsizeof=len)
+        self._feed_states: LRUCache[str, FeedState] = LRUCache(maxsize=max_tracked_feeds)
+        self.description_parser = DescriptionParser(cache_size=description_cache_size)
+
     async def fetch_latest_news(self, feed_url: str) -> list[News]:
         logger.info(f"Fetching feed: {feed_url}")
-        feed = feedparser.parse(feed_url)
+        loop = asyncio.get_running_loop()
+
+        previous = self._feed_states.get(feed_url)
+        downloaded = await self._download_feed(feed_url, previous)
+        if downloaded is None:
+            logger.info(f"Feed not modified: {feed_url}")
+            return [news for _, news in previous.news] if previous else []
+
+        body, headers = downloaded
+        state = await loop.run_in_executor(self._executor, self._parse_feed, feed_url, body, headers, previous)
+        self._feed_states[feed_url] = state
+        news_list = [news for _, news in state.news]
+
+        logger.info(f"Fetched {len(news_list)} valid news items from: {feed_url}")
+        return news_list
+
+    async def fetch_image(self, image_url: str) -> bytes | None:
+        image = self._image_cache.get(image_url)
+        if image is not None:
+            logger.debug(f"Image cache hit: {image_url}")
+            return image
+
+        image = await self._download_image(image_url)
+
+        if image is not None and len(image) <= self._image_cache.maxsize:
+            self._image_cache[image_url] = image
+        return image
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _download_feed(self, feed_url: str, previous: FeedState | None) -> tuple[bytes, dict[str, str]] | None:
+        request_headers = {}
+        if previous is not None:
+            if previous.etag:
+                request_headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                request_headers["If-Modified-Since"] = previous.last_modified
+
+        async with self.http_client.session.get(feed_url, headers=request_headers, timeout=self.timeout) as response:
+            if response.status == 304 and previous is not None:
+                return None
+            response.raise_for_status()
+            body = await self._read_limited(response, self.max_feed_bytes)
+
+            headers = {"content-location": str(response.url)}
+            for name in ("Content-Type", "ETag", "Last-Modified"):
+                value = response.headers.get(name)
+                if value:
+                    headers[name.lower()] = value
+            logger.debug(f"Feed downloaded: {feed_url}, {len(body)} bytes")
+            return body, headers
+
+    async def _read_limited(self, response: aiohttp.ClientResponse, max_bytes: int) -> bytes:
+        if response.content_length and response.content_length > max_bytes:
+            raise RuntimeError(f"Response is too large ({response.content_length} bytes): {response.url}")
+
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            size += len(chunk)
+            if size > max_bytes:
+                raise RuntimeError(f"Response exceeds {max_bytes} bytes: {response.url}")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def _parse_feed(
+        self, feed_url: str, body: bytes, headers: dict[str, str], previous: FeedState | None
+    ) -> FeedState:
+        feed = feedparser.parse(body, response_headers=headers)
 
         if feed.bozo:
             logger.warning(f"Feed parse error for {feed_url}: {feed.bozo_exception}")
@@ -25,17 +131,55 @@ class FeedService(NewsSource):
         if not entries:
             logger.info(f"No entries found for feed: {feed_url}")
 
-        news_list = []
-        async with aiohttp.ClientSession() as session:
-            for entry in entries:
-                if not self._is_valid_entry(entry):
-                    logger.debug(f"Invalid entry skipped: {entry}")
-                    continue
-                news = await self._parse_entry(entry, session)
-                news_list.append(news)
+        previous = previous or FeedState()
+        known = dict(previous.news)
+        news = []
+        fresh = 0
+        newest_published = previous.watermark_published
+        for entry in entries:
+            key = self._entry_key(entry)
+            if key is not None and key in known:
+                news.append((key, known[key]))
+                continue
+
+            published = self._entry_published_at(entry)
+            if (
+                published is not None
+                and previous.watermark_published is not None
+                and published < previous.watermark_published
+            ):
+                continue
+
+            if not self._is_valid_entry(entry):
+                logger.debug(f"Invalid entry skipped: {entry}")
+                continue
+            parsed = self._parse_entry(entry)
+            news.append((key or parsed.link, parsed))
+            fresh += 1
+            if published is not None and (newest_published is None or published > newest_published):
+                newest_published = published
+
+        logger.debug(f"Feed {feed_url}: {fresh} new entries, {len(news)} kept")
+
+        return FeedState(
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            watermark_published=newest_published,
+            news=news,
+        )
 
-        logger.info(f"Fetched {len(news_list)} valid news items from: {feed_url}")
-        return news_list
+    def _entry_key(self, entry: FeedParserDict) -> str | None:
+        key = entry.get('id') or entry.get('link')
+        return key if isinstance(key, str) else None
+
+    def _entry_published_at(self, entry: FeedParserDict) -> datetime | None:
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if parsed is None:
+            return None
+        try:
+            return datetime.fromtimestamp(calendar.timegm(parsed), tz=timezone.utc)
+        except (OverflowError, ValueError, OSError):
+            return None
 
     def _is_valid_entry(self, entry: FeedParserDict) -> bool:
         title = entry.get('title')
@@ -48,7 +192,7 @@ class FeedService(NewsSource):
             )
         return is_valid
 
-    async def _parse_entry(self, entry, session: aiohttp.ClientSession) -> News:
+    def _parse_entry(self, entry: FeedParserDict) -> News:
         title = cast(str, entry.get('title'))
         link = cast(str, entry.get('link'))
         description = cast(str, entry.get('description'))
@@ -60,32 +204,26 @@ class FeedService(NewsSource):
         if img_url:
             logger.debug(f"Found image URL in description: {img_url}")
 
-        image_bytes = await self._download_image(img_url, session) if img_url else None
-
         return News(
             title=title,
             link=link,
             description=text,
-            image_link=image_bytes
+            image_url=img_url,
+            published_at=self._entry_published_at(entry)
         )
 
     def _parse_description(self, description: str) -> tuple[str, str | None]:
-        soup = BeautifulSoup(description, "html.parser")
-        text = soup.get_text(separator="\n", strip=True)
-        img_tag = soup.find("img")
-        img_url = img_tag.get("src") if isinstance(img_tag, Tag) else None
-        if not isinstance(img_url, str):
-            img_url = None
-        return text, img_url
-
-    async def _download_image(self, img_url: str, session: aiohttp.ClientSession) -> bytes | None:
+        return self.description_parser.parse(description)
+
+    async def _download_image(self, img_url: str) -> bytes | None:
         try:
-            async with session.get(img_url, timeout=5) as response:
-                if response.status == 200:
-                    logger.debug(f"Image downloaded successfully: {img_url}")
-                    return await response.read()
-                else:
+            async with self.http_client.session.get(img_url, timeout=self.image_timeout) as response:
+                if response.status != 200:
                     logger.warning(f"Image download failed with status {response.status}: {img_url}")
+                    return None
+                image = await self._read_limited(response, self.max_image_bytes)
+                logger.debug(f"Image downloaded successfully: {img_url}")
+                return image
         except Exception as e:
             logger.warning(f"Error downloading image {img_url}: {e}")
         return None
@@ -7,4 +7,7 @@ class NewsSource(ABC):
     @abstractmethod
     async def fetch_latest_news(self, feed_url: str) -> list[News]:
         pass
-            
\ No newline at end of file
+            
+    @abstractmethod
+    async def fetch_image(self, image_url: str) -> bytes | None:
+        pass
@@ -0,0 +1,167 @@
+import asyncio
+import random
+
+from src.domain.entities import OutboxMessage
+from src.domain.interfaces.outbox_repository import IOutboxRepository
+from src.services.interfaces.message_sender import IMessageSender
+from src.services.news_source.news_source import NewsSource
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+class OutboxWorkerPool:
+    def __init__(
+        self,
+        repository: IOutboxRepository,
+        message_sender: IMessageSender,
+        feed_service: NewsSource,
+        workers: int = 4,
+        batch_size: int = 5,
+        poll_interval: float = 1,
+        max_poll_interval: float = 10,
+        lease_seconds: float = 300,
+        max_attempts: int = 5,
+        base_backoff: float = 10,
+        max_backoff: float = 600,
+    ):
+        self.repository = repository
+        self.message_sender = message_sender
+        self.feed_service = feed_service
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.sent = 0
+        self.failed = 0
+        self._wakeups: list[asyncio.Event] = []
+        self._stopping = False
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        logger.info(f"Starting {self.workers} outbox workers")
+        self._stopping = False
+        self._wakeups = [asyncio.Event() for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._work(number)) for number in range(self.workers)]
+
+    async def enqueue(self, messages: list[OutboxMessage]) -> int:
+        enqueued = await self.repository.enqueue_many(messages)
+        if enqueued:
+            self._wake_all()
+        return enqueued
+
+    async def close(self, timeout: float = 10):
+        self._stopping = True
+        self._wake_all()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Outbox workers stopped: {self.sent} sent, {self.failed} failed")
+
+    async def _work(self, number: int):
+        wakeup = self._wakeups[number]
+        idle_delay = self.poll_interval
+        while not self._stopping:
+            # Cleared before claiming so that an enqueue racing with the claim still wakes us.
+            wakeup.clear()
+            try:
+                messages = await self.repository.claim(self.batch_size, self.lease_seconds)
+            except Exception:
+                logger.exception(f"Outbox worker {number} failed to claim messages")
+                messages = []
+
+            if not messages:
+                await self._idle(wakeup, idle_delay)
+                idle_delay = min(self.max_poll_interval, idle_delay * 2)
+                continue
+
+            idle_delay = self.poll_interval
+            logger.debug(f"Outbox worker {number} claimed {len(messages)} message(s)")
+            for group in self._group(messages):
+                await self._publish(group)
+
+    async def _idle(self, wakeup: asyncio.Event, delay: float):
+        try:
+            await asyncio.wait_for(wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    def _wake_all(self):
+        for wakeup in self._wakeups:
+            wakeup.set()
+
+    def _group(self, messages: list[OutboxMessage]) -> list[list[OutboxMessage]]:
+        groups: dict[str | int, list[OutboxMessage]] = {}
+        for message in messages:
+            groups.setdefault(message.group_key or message.id, []).append(message)
+        return list(groups.values())
+
+    async def _publish(self, group: list[OutboxMessage]):
+        first = group[0]
+        images = await asyncio.gather(*(self._fetch_image(message) for message in group))
+        items = [(message.text, image) for message, image in zip(group, images)]
+        parts = self.message_sender.group_parts(items) if len(group) > 1 else [[0]]
+
+        # Each part is one API call and is acknowledged on its own, so a retry only
+        # resends the parts that did not go out. Rows are marked as sending first, under
+        # this claim's token: rows whose lease lapsed and were claimed again elsewhere are
+        # skipped, and if the process dies mid-call claim() parks them instead of resending.
+        for number, part in enumerate(parts):
+            try:
+                owned = set(await self.repository.mark_sending(
+                    [group[index].id for index in part], first.claim_token, self.lease_seconds
+                ))
+                part = [index for index in part if group[index].id in owned]
+                if not part:
+                    logger.warning(f"Outbox lease lost for a part in channel ID={first.channel_id}, skipping it")
+                    continue
+                if len(part) == 1:
+                    await self.message_sender.send_message(first.channel_id, *items[part[0]])
+                else:
+                    await self.message_sender.send_group(first.channel_id, [items[index] for index in part])
+            except Exception as e:
+                for index in (index for rest in [part, *parts[number + 1:]] for index in rest):
+                    await self._fail(group[index], repr(e))
+                return
+
+            self.sent += len(part)
+            for index in part:
+                message = group[index]
+                logger.info(f"Outbox message {message.id} sent to channel ID={message.channel_id}: {message.source_link}")
+                try:
+                    await self.repository.mark_sent(message.id, message.claim_token)
+                except Exception:
+                    logger.exception(f"Failed to mark outbox message {message.id} as sent")
+
+    async def _fetch_image(self, message: OutboxMessage) -> bytes | None:
+        if not message.media_url:
+            return None
+        return await self.feed_service.fetch_image(message.media_url)
+
+    async def _fail(self, message: OutboxMessage, error: str):
+        if message.attempts >= self.max_attempts:
+            self.failed += 1
+            retry_in = None
+            logger.critical(
+                f"Outbox message {message.id} for channel ID={message.channel_id} failed "
+                f"after {message.attempts} attempts: {error}"
+            )
+        else:
+            retry_in = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (message.attempts - 1)))
+            logger.error(
+                f"Outbox message {message.id} for channel ID={message.channel_id} failed "
+                f"(attempt {message.attempts} of {self.max_attempts}), retrying in {retry_in:.1f}s: {error}"
+            )
+        try:
+            await self.repository.mark_failed(message.id, message.claim_token, error, retry_in)
+        except Exception:
+            logger.exception(f"Failed to record failure of outbox message {message.id}")
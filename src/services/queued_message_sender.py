@@ -0,0 +1,269 @@
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass, field
+from itertools import count
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from src.services.interfaces.message_sender import IMessageSender
+from src.services.rate_limiter import TokenBucket
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+@dataclass
+class OutgoingMessage:
+    chat_id: int
+    text: str
+    attachments: bytes | None
+    priority: int
+    future: asyncio.Future[None]
+    sequence: int
+    items: list[tuple[str, bytes | None]] | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+    @property
+    def size(self) -> int:
+        # Telegram counts every photo of an album, while a digest goes out as one message.
+        if self.items is None:
+            return 1
+        photos = sum(1 for _, image in self.items if image)
+        return photos + (1 if photos < len(self.items) else 0)
+
+
+@dataclass
+class ChatQueue:
+    bucket: TokenBucket
+    messages: list[tuple[int, int, OutgoingMessage]] = field(default_factory=list)
+    scheduled: bool = False
+    sending: bool = False
+
+
+@dataclass
+class SendQueueStats:
+    queued: int
+    chats: int
+    in_flight: int
+    sent: int
+    failed: int
+    retried: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.sent if self.sent else 0.0
+
+
+class QueuedMessageSender(IMessageSender):
+    def __init__(
+        self,
+        sender: IMessageSender,
+        global_rate: float = 30,
+        global_burst: float = 5,
+        per_chat_rate: float = 20 / 60,
+        per_chat_burst: float = 3,
+        max_in_flight: int = 30,
+        max_retries: int = 5,
+        report_every: int = 100,
+    ):
+        self.sender = sender
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_burst)
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self.report_every = report_every
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._chats: dict[int, ChatQueue] = {}
+        self._waiting: list[tuple[float, int, int]] = []
+        self._ready: list[tuple[int, int, int]] = []
+        self._sequence = count()
+        self._wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def send_message(
+        self, chat_id: int, text: str, attachments: bytes | None = None, priority: int = PRIORITY_NORMAL
+    ) -> None:
+        message = self._submit(chat_id, text, attachments, None, priority)
+        await asyncio.shield(message.future)
+
+    async def send_group(
+        self, chat_id: int, items: list[tuple[str, bytes | None]], priority: int = PRIORITY_NORMAL
+    ) -> None:
+        # Each part is a single API call queued and retried on its own, so a flood wait
+        # in the middle of a group never resends the parts that already went out.
+        messages = [
+            self._submit(chat_id, "", None, [items[index] for index in part], priority)
+            for part in self.sender.group_parts(items)
+        ]
+        results = await asyncio.gather(
+            *(asyncio.shield(message.future) for message in messages), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def group_parts(self, items: list[tuple[str, bytes | None]]) -> list[list[int]]:
+        return self.sender.group_parts(items)
+
+    def stats(self) -> SendQueueStats:
+        return SendQueueStats(
+            queued=self.queued,
+            chats=sum(1 for chat in self._chats.values() if chat.messages or chat.sending),
+            in_flight=len(self._in_flight),
+            sent=self.sent,
+            failed=self.failed,
+            retried=self.retried,
+            total_wait_seconds=self.total_wait_seconds,
+            max_wait_seconds=self.max_wait_seconds,
+        )
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        for chat in self._chats.values():
+            for _, _, message in chat.messages:
+                if not message.future.done():
+                    message.future.set_exception(RuntimeError("Message sender closed"))
+            chat.messages.clear()
+        self.queued = 0
+        logger.info("Message send queue closed")
+
+    def _submit(
+        self,
+        chat_id: int,
+        text: str,
+        attachments: bytes | None,
+        items: list[tuple[str, bytes | None]] | None,
+        priority: int,
+    ) -> OutgoingMessage:
+        loop = asyncio.get_running_loop()
+        message = OutgoingMessage(
+            chat_id, text, attachments, priority, loop.create_future(), next(self._sequence), items
+        )
+
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = ChatQueue(TokenBucket(rate=self.per_chat_rate, capacity=self.per_chat_burst))
+        heapq.heappush(chat.messages, (priority, message.sequence, message))
+        self.queued += 1
+        self._schedule(chat_id, chat)
+        self._ensure_dispatcher()
+        return message
+
+    def _ensure_dispatcher(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._wakeup.set()
+
+    def _schedule(self, chat_id: int, chat: ChatQueue):
+        if chat.scheduled or chat.sending or not chat.messages:
+            return
+        chat.scheduled = True
+        ready_at = time.monotonic() + chat.bucket.delay(chat.messages[0][2].size)
+        heapq.heappush(self._waiting, (ready_at, next(self._sequence), chat_id))
+        self._wakeup.set()
+
+    async def _dispatch(self):
+        while True:
+            now = time.monotonic()
+            while self._waiting and self._waiting[0][0] <= now:
+                _, sequence, chat_id = heapq.heappop(self._waiting)
+                chat = self._chats[chat_id]
+                heapq.heappush(self._ready, (chat.messages[0][0], sequence, chat_id))
+
+            if not self._ready:
+                self._wakeup.clear()
+                timeout = self._waiting[0][0] - now if self._waiting else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._slots.acquire()
+            _, _, chat_id = heapq.heappop(self._ready)
+            chat = self._chats[chat_id]
+            _, _, message = heapq.heappop(chat.messages)
+            try:
+                await self.global_bucket.acquire(message.size)
+                await chat.bucket.acquire(message.size)
+            except asyncio.CancelledError:
+                heapq.heappush(chat.messages, (message.priority, message.sequence, message))
+                raise
+            chat.scheduled = False
+            chat.sending = True
+
+            task = asyncio.create_task(self._send(chat_id, chat, message))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, chat_id: int, chat: ChatQueue, message: OutgoingMessage):
+        try:
+            message.attempts += 1
+            if message.items is not None:
+                await self.sender.send_group(chat_id, message.items)
+            else:
+                await self.sender.send_message(chat_id, message.text, message.attachments)
+        except TelegramRetryAfter as e:
+            if message.attempts <= self.max_retries:
+                self.retried += 1
+                chat.bucket.pause(e.retry_after)
+                heapq.heappush(chat.messages, (message.priority, message.sequence, message))
+                logger.warning(
+                    f"Flood limit for chat {chat_id}, retrying in {e.retry_after}s "
+                    f"(attempt {message.attempts} of {self.max_retries + 1})"
+                )
+                return
+            self._finish(message, e)
+        except Exception as e:
+            self._finish(message, e)
+        else:
+            self._finish(message)
+        finally:
+            chat.sending = False
+            self._slots.release()
+            self._schedule(chat_id, chat)
+
+    def _finish(self, message: OutgoingMessage, error: Exception | None = None):
+        self.queued -= 1
+        waited = time.monotonic() - message.enqueued_at
+        if error is None:
+            self.sent += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        else:
+            self.failed += 1
+
+        if not message.future.done():
+            if error is None:
+                message.future.set_result(None)
+            else:
+                message.future.set_exception(error)
+
+        if self.report_every and (self.sent + self.failed) % self.report_every == 0:
+            stats = self.stats()
+            logger.info(
+                f"Send queue: {stats.sent} sent, {stats.failed} failed, {stats.retried} retried, "
+                f"{stats.queued} queued over {stats.chats} chats, avg wait {stats.avg_wait_seconds:.2f}s, "
+                f"max wait {stats.max_wait_seconds:.2f}s"
+            )
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+@dataclass
+class RateLimiterStats:
+    rate: float
+    tokens: float
+    waiting: int
+    acquired: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+    throttled: int
+    paused_for_seconds: float
+
+    @property
+    def avg_wait_seconds(self) -> float:
+        return self.total_wait_seconds / self.acquired if self.acquired else 0.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+
+    async def acquire(self, tokens: float = 1.0):
+        started_at = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    delay = self._delay_for(tokens)
+                    if delay <= 0:
+                        self._tokens -= tokens
+                        break
+                    await asyncio.sleep(delay)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started_at
+        self.acquired += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def delay(self, tokens: float = 1.0) -> float:
+        return self._delay_for(tokens)
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.throttled += 1
+
+    def stats(self) -> RateLimiterStats:
+        self._refill()
+        return RateLimiterStats(
+            rate=self.rate,
+            tokens=self._tokens,
+            waiting=self.waiting,
+            acquired=self.acquired,
+            total_wait_seconds=self.total_wait_seconds,
+            max_wait_seconds=self.max_wait_seconds,
+            throttled=self.throttled,
+            paused_for_seconds=max(0.0, self._paused_until - time.monotonic()),
+        )
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def _delay_for(self, tokens: float) -> float:
+        self._refill()
+        paused = self._paused_until - time.monotonic()
+        if paused > 0:
+            return paused
+        # Requests larger than the burst wait for a full bucket and leave it in debt.
+        needed = min(tokens, self.capacity)
+        if self._tokens >= needed:
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    def __init__(
+        self,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        capacity: float | None = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+    ):
+        super().__init__(rate, capacity)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+
+    def on_success(self):
+        if self.rate < self.max_rate:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after: float | None = None):
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        if retry_after:
+            self.pause(retry_after)
+        else:
+            self.throttled += 1
+        logger.warning(f"Rate limited, lowering rate to {self.rate:.3f}/s, retry_after={retry_after}")
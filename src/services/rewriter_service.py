@@ -1,25 +1,21 @@
+import asyncio
+import random
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import aiohttp
 from aiohttp import ClientResponseError
+from src.infrastructure.http_client import HttpClient
 from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.services.rate_limiter import AdaptiveTokenBucket, RateLimiterStats
 from src.logging_config import logger
 
 
 logger = logger.getChild(__name__)
 
+PROMPT_VERSION = "1"
 
-class DeepSeekTextRewriterService(ITextRewriterService):
-    def __init__(self, api_key: str, model: str = "deepseek/deepseek-chat-v3-0324:free"):
-        self.api_key = api_key
-        self.model = model
-        self.base_url = "https://openrouter.ai/api/v1/chat/completions"
-
-    async def rewrite(self, text: str) -> str:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
-        prompt = """
+REWRITE_PROMPT = """
             Ты — помощник, который обрабатывает новостные тексты для публикации в Telegram.
 
             Твоя задача:
@@ -36,6 +32,169 @@ class DeepSeekTextRewriterService(ITextRewriterService):
             Вот исходный текст:
             """
 
+BATCH_PROMPT = """
+            Ниже приведены несколько независимых новостных текстов. Каждый начинается со строки-маркера вида ### N, где N — номер текста.
+            Обработай каждый текст отдельно по правилам ниже и верни результаты в том же порядке.
+            Перед каждым результатом выведи ту же строку-маркер ### N на отдельной строке. Ничего, кроме маркеров и результатов, не выводи.
+            """
+
+BATCH_MARKER = re.compile(r"^[ \t*]*#{3}[ \t]*(\d+)[ \t.:)*]*$", re.MULTILINE)
+
+
+class DeepSeekTextRewriterService(ITextRewriterService):
+    def __init__(
+        self,
+        api_key: str,
+        http_client: HttpClient,
+        model: str = "deepseek/deepseek-chat-v3-0324:free",
+        timeout: float = 30,
+        max_batch_size: int = 5,
+        rate_limiter: AdaptiveTokenBucket | None = None,
+        max_attempts: int = 5,
+        retry_deadline: float = 120,
+        base_backoff: float = 1,
+        max_backoff: float = 30,
+        base_url: str = "https://openrouter.ai/api/v1",
+    ):
+        self.api_key = api_key
+        self.http_client = http_client
+        self.model = model
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_batch_size = max_batch_size
+        self.rate_limiter = rate_limiter or AdaptiveTokenBucket(rate=0.3, min_rate=0.02, max_rate=1, capacity=3)
+        self.max_attempts = max_attempts
+        self.retry_deadline = retry_deadline
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.base_url = base_url.rstrip("/")
+        self.completions_url = f"{self.base_url}/chat/completions"
+
+    def cache_namespace(self) -> str:
+        return f"{self.model}:{PROMPT_VERSION}"
+
+    def stats(self) -> RateLimiterStats:
+        return self.rate_limiter.stats()
+
+    async def rewrite(self, text: str) -> str:
+        content = await self._complete(REWRITE_PROMPT + text)
+        logger.debug(f"Rewritten text length: {len(content)} chars")
+        return content
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        if len(texts) <= 1:
+            return [await self.rewrite(text) for text in texts]
+
+        results: list[str] = []
+        for start in range(0, len(texts), self.max_batch_size):
+            chunk = texts[start:start + self.max_batch_size]
+            if len(chunk) == 1:
+                results.append(await self.rewrite(chunk[0]))
+            else:
+                results.extend(await self._rewrite_chunk(chunk))
+        return results
+
+    async def _rewrite_chunk(self, texts: list[str]) -> list[str]:
+        numbered = "\n\n".join(f"### {i}\n{text}" for i, text in enumerate(texts, start=1))
+        timeout = aiohttp.ClientTimeout(total=(self.timeout.total or 30) * len(texts))
+        content = await self._complete(BATCH_PROMPT + REWRITE_PROMPT + "\n" + numbered, timeout)
+
+        parsed = self._split_batch(content, len(texts))
+        missing = [i for i, item in enumerate(parsed) if item is None]
+        if missing:
+            logger.warning(
+                f"Batch rewrite returned {len(texts) - len(missing)} of {len(texts)} items, "
+                f"rewriting {len(missing)} individually"
+            )
+            fallback = await asyncio.gather(*(self.rewrite(texts[i]) for i in missing))
+            for i, item in zip(missing, fallback):
+                parsed[i] = item
+
+        logger.debug(f"Batch of {len(texts)} texts rewritten in one request")
+        return [item or "" for item in parsed]
+
+    def _split_batch(self, content: str, expected: int) -> list[str | None]:
+        items: list[str | None] = [None] * expected
+        markers = list(BATCH_MARKER.finditer(content))
+        for marker, following in zip(markers, markers[1:] + [None]):
+            index = int(marker.group(1)) - 1
+            end = following.start() if following else len(content)
+            item = content[marker.end():end].strip()
+            if 0 <= index < expected and item and items[index] is None:
+                items[index] = item
+        return items
+
+    async def _complete(self, prompt: str, timeout: aiohttp.ClientTimeout | None = None) -> str:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.retry_deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"OpenRouter retry deadline of {self.retry_deadline}s exceeded")
+            await asyncio.wait_for(self.rate_limiter.acquire(), remaining)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"OpenRouter retry deadline of {self.retry_deadline}s exceeded")
+            total = (timeout or self.timeout).total
+            attempt_timeout = aiohttp.ClientTimeout(total=min(total, remaining) if total else remaining)
+
+            retry_after = None
+            try:
+                content = await self._post(prompt, attempt_timeout)
+                self.rate_limiter.on_success()
+                return content
+            except ClientResponseError as e:
+                if e.status != 429 and e.status < 500:
+                    logger.exception(f"OpenRouter API responded with HTTP error: {e.status} {e.message}")
+                    raise
+                retry_after = self._retry_after(e)
+                if e.status == 429:
+                    self.rate_limiter.on_throttled(retry_after)
+                error: Exception = e
+                reason = f"HTTP {e.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+                reason = repr(e)
+            except Exception as e:
+                logger.exception(f"Unexpected error during text rewriting: {repr(e)}")
+                raise
+
+            if retry_after is not None:
+                delay = retry_after
+            else:
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1)))
+            if attempt >= self.max_attempts or loop.time() + delay >= deadline:
+                logger.error(f"OpenRouter request failed after {attempt} attempts: {reason}")
+                raise error
+
+            logger.warning(
+                f"OpenRouter attempt {attempt} failed ({reason}), retrying in {delay:.1f}s; "
+                f"limiter: {self.rate_limiter.stats()}"
+            )
+            await asyncio.sleep(delay)
+
+    def _retry_after(self, error: ClientResponseError) -> float | None:
+        value = error.headers.get("Retry-After") if error.headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    async def _post(self, prompt: str, timeout: aiohttp.ClientTimeout) -> str:
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
 
         body = {
             "model": self.model,
@@ -45,35 +204,24 @@ class DeepSeekTextRewriterService(ITextRewriterService):
                     "content": [
                         {
                             "type": "text",
-                            "text": prompt + text
+                            "text": prompt
                         }
                     ]
                 }
             ]
         }
 
-        try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.post(self.base_url, headers=headers, json=body) as resp:
-                    resp.raise_for_status()
-                    data = await resp.json()
-
-                    content = (
-                        data.get("choices", [{}])[0]
-                        .get("message", {})
-                        .get("content")
-                    )
-                    if not content:
-                        logger.error(f"OpenRouter API returned empty content: {data}")
-                        raise RuntimeError("OpenRouter API returned empty content")
-
-                    logger.debug(f"Rewritten text length: {len(content)} chars")
-                    return content
-
-        except ClientResponseError as e:
-            logger.exception(f"OpenRouter API responded with HTTP error: {e.status} {e.message}")
-            raise
-
-        except Exception as e:
-            logger.exception(f"Unexpected error during text rewriting: {repr(e)}")
-            raise
+        async with self.http_client.session.post(self.completions_url, headers=headers, json=body, timeout=timeout) as resp:
+            resp.raise_for_status()
+            data = await resp.json()
+
+            content = (
+                data.get("choices", [{}])[0]
+                .get("message", {})
+                .get("content")
+            )
+            if not content:
+                logger.error(f"OpenRouter API returned empty content: {data}")
+                raise RuntimeError("OpenRouter API returned empty content")
+
+            return content
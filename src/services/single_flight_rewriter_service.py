@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+from collections import Counter
+
+from src.services.interfaces.text_rewriter import ITextRewriterService
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+class SingleFlightTextRewriterService(ITextRewriterService):
+    def __init__(self, rewriter: ITextRewriterService):
+        self.rewriter = rewriter
+        self.coalesced = 0
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._runs: dict[str, asyncio.Task[None]] = {}
+        self._waiters: Counter[str] = Counter()
+
+    def cache_namespace(self) -> str:
+        return self.rewriter.cache_namespace()
+
+    async def rewrite(self, text: str) -> str:
+        return (await self.rewrite_batch([text]))[0]
+
+    async def rewrite_batch(self, texts: list[str]) -> list[str]:
+        loop = asyncio.get_running_loop()
+        keys = [self._key(text) for text in texts]
+        futures: dict[str, asyncio.Future[str]] = {}
+        owned: dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in futures:
+                continue
+            future = self._in_flight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._in_flight[key] = future
+                owned[key] = text
+            else:
+                self.coalesced += 1
+                logger.debug(f"Joining in-flight rewrite: {key}")
+            futures[key] = future
+
+        if owned:
+            task = asyncio.ensure_future(self._run(owned))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            for key in owned:
+                self._runs[key] = task
+
+        for key in futures:
+            self._waiters[key] += 1
+        try:
+            return [await asyncio.shield(futures[key]) for key in keys]
+        finally:
+            for key in futures:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    del self._waiters[key]
+            self._cancel_abandoned(list(futures))
+
+    def _cancel_abandoned(self, keys: list[str]):
+        # Stop an upstream call once every caller waiting on it has gone away.
+        for key in keys:
+            task = self._runs.get(key)
+            if task is None or task.done():
+                continue
+            if not any(self._waiters[other] for other, run in self._runs.items() if run is task):
+                logger.debug(f"All waiters left, cancelling rewrite: {key}")
+                task.cancel()
+
+    async def _run(self, owned: dict[str, str]):
+        try:
+            contents = await self.rewriter.rewrite_batch(list(owned.values()))
+            if len(contents) != len(owned):
+                raise RuntimeError(f"Rewriter returned {len(contents)} results for {len(owned)} texts")
+            for key, content in zip(owned, contents):
+                self._in_flight[key].set_result(content)
+        except BaseException as e:
+            for key in owned:
+                future = self._in_flight[key]
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # Waiters may all have been cancelled; do not log it as unretrieved.
+                    future.exception()
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            for key in owned:
+                self._in_flight.pop(key, None)
+                self._runs.pop(key, None)
+
+    def _key(self, text: str) -> str:
+        payload = f"{self.cache_namespace()}\0{text}".encode("utf-8", "surrogatepass")
+        return hashlib.sha256(payload).hexdigest()
@@ -1,25 +1,155 @@
+import hashlib
+
 from aiogram import Bot
-from aiogram.types import InputFile, BufferedInputFile
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import InputFile, BufferedInputFile, InputMediaPhoto
+from cachetools import LRUCache
 from src.services.interfaces.message_sender import IMessageSender
 from src.logging_config import logger
 
 
 logger = logger.getChild(__name__)
 
+MEDIA_GROUP_SIZE = 10
+CAPTION_LIMIT = 1024
+MESSAGE_LIMIT = 4096
+DIGEST_SEPARATOR = "\n\n———\n\n"
+FILE_ID_ERRORS = ("file identifier", "file_id", "file reference", "file_reference", "media_empty")
+
+
+def is_file_id_error(error: TelegramBadRequest) -> bool:
+    message = error.message.lower()
+    return any(marker in message for marker in FILE_ID_ERRORS)
+
+
+def build_digests(texts: list[str], limit: int = MESSAGE_LIMIT) -> list[str]:
+    digests = []
+    current = ""
+    for text in texts:
+        text = text[:limit]
+        if current and len(current) + len(DIGEST_SEPARATOR) + len(text) > limit:
+            digests.append(current)
+            current = ""
+        current = f"{current}{DIGEST_SEPARATOR}{text}" if current else text
+    if current:
+        digests.append(current)
+    return digests
+
+
+def split_group(items: list[tuple[str, bytes | None]], limit: int = MESSAGE_LIMIT) -> list[list[int]]:
+    photos = [index for index, (_, image) in enumerate(items) if image]
+    parts = [photos[start:start + MEDIA_GROUP_SIZE] for start in range(0, len(photos), MEDIA_GROUP_SIZE)]
+    digest: list[int] = []
+    size = 0
+    for index, (text, image) in enumerate(items):
+        if image:
+            continue
+        length = min(len(text), limit)
+        if digest and size + len(DIGEST_SEPARATOR) + length > limit:
+            parts.append(digest)
+            digest = []
+        size = size + len(DIGEST_SEPARATOR) + length if digest else length
+        digest.append(index)
+    if digest:
+        parts.append(digest)
+    return parts
+
 
 class TelegramMessageSender(IMessageSender):
-    def __init__(self, bot: Bot):
+    def __init__(self, bot: Bot, file_id_cache_size: int = 4096):
         self.bot = bot
+        self.file_ids: LRUCache[bytes, str] = LRUCache(maxsize=file_id_cache_size)
+        self.uploads = 0
+        self.reused = 0
 
     async def send_message(self, chat_id: int, text: str, attachments: bytes | None = None) -> None:
         try:
             if attachments:
-                photo = BufferedInputFile(attachments, filename="image.jpg")
-                await self.bot.send_photo(chat_id, photo=photo, caption=text)
-                logger.info(f"Отправлено изображение в чат {chat_id}, размер: {len(attachments)} байт")
+                await self._send_photo(chat_id, text, attachments)
             else:
                 await self.bot.send_message(chat_id, text)
                 logger.info(f"Отправлено текстовое сообщение в чат {chat_id}")
+        except TelegramRetryAfter as e:
+            logger.warning(f"Превышен лимит отправки в чат {chat_id}, повтор через {e.retry_after} с")
+            raise
         except Exception as e:
             logger.critical(f"Ошибка при отправке сообщения в чат {chat_id}: {repr(e)}", exc_info=True)
             raise
+
+    async def send_group(self, chat_id: int, items: list[tuple[str, bytes | None]]) -> None:
+        parts = split_group(items)
+        try:
+            for part in parts:
+                await self._send_part(chat_id, [items[index] for index in part])
+            logger.info(f"Отправлена группа из {len(items)} новостей в чат {chat_id} за {len(parts)} запрос(ов)")
+        except TelegramRetryAfter as e:
+            logger.warning(f"Превышен лимит отправки в чат {chat_id}, повтор через {e.retry_after} с")
+            raise
+        except Exception as e:
+            logger.critical(f"Ошибка при отправке группы сообщений в чат {chat_id}: {repr(e)}", exc_info=True)
+            raise
+
+    def group_parts(self, items: list[tuple[str, bytes | None]]) -> list[list[int]]:
+        return split_group(items)
+
+    async def _send_part(self, chat_id: int, items: list[tuple[str, bytes | None]]):
+        photos = [(text, image) for text, image in items if image]
+        if len(photos) == 1:
+            await self._send_photo(chat_id, *photos[0])
+        elif photos:
+            await self._send_media_group(chat_id, photos)
+        else:
+            for digest in build_digests([text for text, _ in items]):
+                await self.bot.send_message(chat_id, digest)
+
+    async def _send_media_group(self, chat_id: int, photos: list[tuple[str, bytes]]):
+        keys = [hashlib.blake2b(image, digest_size=16).digest() for _, image in photos]
+        if any(key in self.file_ids for key in keys):
+            try:
+                await self._post_media_group(chat_id, photos, keys, reuse=True)
+                return
+            except TelegramBadRequest as e:
+                if not is_file_id_error(e):
+                    raise
+                for key in keys:
+                    self.file_ids.pop(key, None)
+                logger.warning(f"file_id отклонён для чата {chat_id}, загружаем альбом заново: {e.message}")
+        await self._post_media_group(chat_id, photos, keys, reuse=False)
+
+    async def _post_media_group(self, chat_id: int, photos: list[tuple[str, bytes]], keys: list[bytes], reuse: bool):
+        media = []
+        for (text, image), key in zip(photos, keys):
+            file_id = self.file_ids.get(key) if reuse else None
+            photo = file_id or BufferedInputFile(image, filename="image.jpg")
+            media.append(InputMediaPhoto(media=photo, caption=text[:CAPTION_LIMIT]))
+
+        messages = await self.bot.send_media_group(chat_id, media=media)
+        for message, key, item in zip(messages, keys, media):
+            if isinstance(item.media, str):
+                self.reused += 1
+            else:
+                self.uploads += 1
+            if message.photo:
+                self.file_ids[key] = message.photo[-1].file_id
+
+    async def _send_photo(self, chat_id: int, text: str, attachments: bytes):
+        key = hashlib.blake2b(attachments, digest_size=16).digest()
+        file_id = self.file_ids.get(key)
+        if file_id is not None:
+            try:
+                await self.bot.send_photo(chat_id, photo=file_id, caption=text)
+                self.reused += 1
+                logger.info(f"Отправлено изображение в чат {chat_id} по file_id ({self.reused} повторных использований)")
+                return
+            except TelegramBadRequest as e:
+                if not is_file_id_error(e):
+                    raise
+                self.file_ids.pop(key, None)
+                logger.warning(f"file_id отклонён для чата {chat_id}, загружаем изображение заново: {e.message}")
+
+        photo = BufferedInputFile(attachments, filename="image.jpg")
+        message = await self.bot.send_photo(chat_id, photo=photo, caption=text)
+        self.uploads += 1
+        if message.photo:
+            self.file_ids[key] = message.photo[-1].file_id
+        logger.info(f"Отправлено изображение в чат {chat_id}, размер: {len(attachments)} байт")
@@ -0,0 +1,118 @@
+import re
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+
+from src.logging_config import logger
+
+
+logger = logger.getChild(__name__)
+
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+|\n+")
+WORD = re.compile(r"\w+", re.UNICODE)
+BOILERPLATE = re.compile(
+    r"подпис|подробнее|читайте (также|нас)|реклам|перейд|переход|по ссылке|наш (канал|сайт)|"
+    r"спонсор|партн[её]р|промокод|скидк|t\.me/|https?://|www\.|©|"
+    r"subscribe|read more|click here|sponsored|advertis|follow us",
+    re.IGNORECASE,
+)
+SIZE_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+@dataclass
+class SizeHistogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(SIZE_BUCKETS) + 1))
+    total: int = 0
+
+    def add(self, size: int):
+        self.counts[bisect_right(SIZE_BUCKETS, size)] += 1
+        self.total += size
+
+    def __str__(self) -> str:
+        labels = [f"<={bound}" for bound in SIZE_BUCKETS] + [f">{SIZE_BUCKETS[-1]}"]
+        return ", ".join(f"{label}: {count}" for label, count in zip(labels, self.counts) if count)
+
+
+class TextCompactor:
+    def __init__(self, max_chars: int = 2500, min_word_length: int = 4, report_every: int = 100):
+        self.max_chars = max_chars
+        self.min_word_length = min_word_length
+        self.report_every = report_every
+        self.before = SizeHistogram()
+        self.after = SizeHistogram()
+        self.compacted = 0
+        self.processed = 0
+
+    def compact(self, text: str, max_chars: int | None = None) -> str:
+        budget = max_chars or self.max_chars
+        result = text if len(text) <= budget else self._compact(text, budget)
+
+        self.processed += 1
+        self.before.add(len(text))
+        self.after.add(len(result))
+        if result is not text:
+            self.compacted += 1
+            logger.debug(f"Text compacted from {len(text)} to {len(result)} chars")
+        if self.report_every and self.processed % self.report_every == 0:
+            self.report()
+        return result
+
+    def report(self):
+        logger.info(
+            f"Compaction: {self.compacted} of {self.processed} texts shortened, "
+            f"{self.before.total} -> {self.after.total} chars; "
+            f"before [{self.before}]; after [{self.after}]"
+        )
+
+    def sentences(self, text: str) -> list[str]:
+        unique = {}
+        for sentence in SENTENCE_SPLIT.split(text):
+            sentence = sentence.strip() if sentence else ""
+            if sentence:
+                unique.setdefault(sentence.lower(), sentence)
+        return list(unique.values())
+
+    def rank(self, sentences: list[str]) -> list[float]:
+        words = [self._words(sentence) for sentence in sentences]
+        frequencies = Counter(word for sentence_words in words for word in set(sentence_words))
+        top = max(frequencies.values(), default=1)
+
+        scores = []
+        for position, (sentence, sentence_words) in enumerate(zip(sentences, words)):
+            if not sentence_words or BOILERPLATE.search(sentence):
+                scores.append(0.0)
+                continue
+            weight = sum(frequencies[word] / top for word in sentence_words) / len(sentence_words) ** 0.5
+            if any(char.isdigit() for char in sentence):
+                weight *= 1.2
+            weight *= 1 + 1 / (position + 2)
+            scores.append(weight)
+        return scores
+
+    def select(self, sentences: list[str], budget: int) -> list[str]:
+        scores = self.rank(sentences)
+        chosen = set()
+        used = 0
+        for index in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+            if scores[index] <= 0:
+                break
+            length = len(sentences[index]) + 1
+            if used + length > budget:
+                continue
+            chosen.add(index)
+            used += length
+        return [sentence for index, sentence in enumerate(sentences) if index in chosen]
+
+    def _compact(self, text: str, budget: int) -> str:
+        title, _, body = text.partition("\n")
+        if len(title) >= budget:
+            return title[:budget]
+
+        kept = self.select(self.sentences(body), budget - len(title) - 1)
+        if not kept:
+            return (title + "\n" + body)[:budget]
+        return title + "\n" + " ".join(kept)
+
+    def _words(self, sentence: str) -> list[str]:
+        return [word for word in WORD.findall(sentence.lower()) if len(word) >= self.min_word_length]
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.makedirs("logs", exist_ok=True)
+
+from src.infrastructure.http_client import HttpClient  # noqa: E402
+from src.services.rate_limiter import AdaptiveTokenBucket  # noqa: E402
+from src.services.rewriter_service import DeepSeekTextRewriterService  # noqa: E402
+from tools.fake_openrouter import FakeOpenRouter, FakeOpenRouterConfig, start_server  # noqa: E402
+
+
+SAMPLE_TEXT = (
+    "Правительство объявило о новой программе поддержки малого бизнеса\n"
+    "Программа рассчитана на три года и включает льготные кредиты. "
+    "По словам министра, в ней примут участие более 20 тысяч компаний. "
+    "Подписывайтесь на наш канал, чтобы не пропустить новости. "
+    "Первые заявки начнут принимать уже в следующем месяце."
+)
+
+
+@dataclass
+class BenchResult:
+    concurrency: int
+    batch_size: int
+    requests: int
+    elapsed: float
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    def percentile(self, q: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def __str__(self) -> str:
+        rate = self.succeeded * self.batch_size / self.elapsed if self.elapsed else 0.0
+        errors = ", ".join(f"{name}: {count}" for name, count in self.errors.items()) or "none"
+        mean = statistics.fmean(self.latencies) if self.latencies else 0.0
+        return (
+            f"concurrency={self.concurrency:<4} batch={self.batch_size:<2} "
+            f"ok={self.succeeded}/{self.requests} rewrites/s={rate:7.2f} "
+            f"mean={mean:6.2f}s p50={self.percentile(0.5):6.2f}s p95={self.percentile(0.95):6.2f}s "
+            f"p99={self.percentile(0.99):6.2f}s errors: {errors}"
+        )
+
+
+async def run_level(
+    rewriter: DeepSeekTextRewriterService, concurrency: int, requests: int, batch_size: int
+) -> BenchResult:
+    result = BenchResult(concurrency=concurrency, batch_size=batch_size, requests=requests, elapsed=0.0)
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            started_at = time.monotonic()
+            try:
+                if batch_size > 1:
+                    await rewriter.rewrite_batch([SAMPLE_TEXT] * batch_size)
+                else:
+                    await rewriter.rewrite(SAMPLE_TEXT)
+            except Exception as e:
+                result.errors[type(e).__name__] += 1
+            else:
+                result.latencies.append(time.monotonic() - started_at)
+
+    started_at = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.monotonic() - started_at
+    return result
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load benchmark for the OpenRouter text rewriter")
+    parser.add_argument("--base-url", default=None, help="rewriter endpoint; spawns a local fake server if omitted")
+    parser.add_argument("--api-key", default=os.getenv("API_KEY", "bench"))
+    parser.add_argument("--concurrency", default="1,8,32,128", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--batch-size", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=1000.0, help="rewriter token bucket rate, requests/s")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--port", type=int, default=8081, help="port for the spawned fake server")
+    parser.add_argument("--latency", default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.2)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    runner = None
+    fake = None
+    base_url = args.base_url
+    if base_url is None:
+        fake = FakeOpenRouter(
+            FakeOpenRouterConfig(
+                latency=args.latency,
+                latency_mean=args.latency_mean,
+                latency_sigma=args.latency_sigma,
+                rate_429=args.rate_429,
+                rate_5xx=args.rate_5xx,
+                retry_after=args.retry_after,
+            ),
+            seed=args.seed,
+        )
+        runner = await start_server(fake, "127.0.0.1", args.port)
+        base_url = f"http://127.0.0.1:{args.port}/api/v1"
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    http_client = HttpClient(limit=max(levels) * 2, limit_per_host=max(levels) * 2)
+    try:
+        for concurrency in levels:
+            rewriter = DeepSeekTextRewriterService(
+                args.api_key,
+                http_client,
+                timeout=args.timeout,
+                max_batch_size=max(1, args.batch_size),
+                rate_limiter=AdaptiveTokenBucket(
+                    rate=args.rate, min_rate=args.rate / 10, max_rate=args.rate, capacity=args.rate
+                ),
+                max_attempts=args.max_attempts,
+                base_url=base_url,
+            )
+            result = await run_level(rewriter, concurrency, args.requests, args.batch_size)
+            limiter = rewriter.stats()
+            print(
+                f"{result} limiter: rate={limiter.rate:.2f}/s throttled={limiter.throttled} "
+                f"avg_wait={limiter.avg_wait_seconds:.3f}s"
+            )
+        if fake is not None:
+            stats = fake.stats
+            print(
+                f"fake server: requests={stats.requests} completed={stats.completed} "
+                f"throttled={stats.throttled} server_errors={stats.server_errors} "
+                f"max_in_flight={stats.max_in_flight}"
+            )
+    finally:
+        await http_client.close()
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.makedirs("logs", exist_ok=True)
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.client.telegram import TelegramAPIServer  # noqa: E402
+
+from src.services.queued_message_sender import QueuedMessageSender  # noqa: E402
+from src.services.telegram_message_sender import TelegramMessageSender  # noqa: E402
+from tools.fake_telegram import FakeTelegram, FakeTelegramConfig, start_server  # noqa: E402
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(sender: QueuedMessageSender, chats: int, messages: int, images: int, group_size: int):
+    latencies: list[float] = []
+    errors: Counter[str] = Counter()
+    pictures = [os.urandom(50_000) for _ in range(images)]
+
+    async def send(number: int):
+        chat_id = -1000000000000 - number % chats
+        started_at = time.monotonic()
+        try:
+            if group_size > 1:
+                items = [
+                    (f"Новость {number}.{index}", pictures[(number + index) % images] if images else None)
+                    for index in range(group_size)
+                ]
+                await sender.send_group(chat_id, items)
+            else:
+                image = pictures[number % images] if images else None
+                await sender.send_message(chat_id, f"Новость {number}", image)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        else:
+            latencies.append(time.monotonic() - started_at)
+
+    started_at = time.monotonic()
+    await asyncio.gather(*(send(number) for number in range(messages)))
+    return time.monotonic() - started_at, latencies, errors
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Send-path benchmark against a Telegram Bot API endpoint")
+    parser.add_argument("--api-url", default=None, help="Bot API base URL; spawns a local fake server if omitted")
+    parser.add_argument("--token", default="123456:fake-token")
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=300)
+    parser.add_argument("--images", type=int, default=0, help="distinct images to rotate through, 0 sends text")
+    parser.add_argument("--group-size", type=int, default=1, help="items per send_group call, 1 sends singles")
+    parser.add_argument("--global-rate", type=float, default=30)
+    parser.add_argument("--per-chat-rate", type=float, default=20 / 60)
+    parser.add_argument("--port", type=int, default=8082, help="port for the spawned fake server")
+    parser.add_argument("--latency-mean", type=float, default=0.05)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--server-global-limit", type=float, default=30)
+    parser.add_argument("--server-chat-limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+    runner = None
+    fake = None
+    api_url = args.api_url
+    if api_url is None:
+        fake = FakeTelegram(
+            FakeTelegramConfig(
+                latency_mean=args.latency_mean,
+                flood_rate=args.flood_rate,
+                retry_after=args.retry_after,
+                global_limit=args.server_global_limit,
+                chat_limit=args.server_chat_limit,
+            ),
+            seed=args.seed,
+        )
+        runner = await start_server(fake, "127.0.0.1", args.port)
+        api_url = f"http://127.0.0.1:{args.port}"
+
+    bot = Bot(token=args.token, session=AiohttpSession(api=TelegramAPIServer.from_base(api_url)))
+    telegram_sender = TelegramMessageSender(bot)
+    sender = QueuedMessageSender(
+        telegram_sender, global_rate=args.global_rate, per_chat_rate=args.per_chat_rate, report_every=0
+    )
+    try:
+        elapsed, latencies, errors = await run(sender, args.chats, args.messages, args.images, args.group_size)
+        stats = sender.stats()
+        sent_items = len(latencies) * max(1, args.group_size)
+        print(
+            f"sent {len(latencies)}/{args.messages} calls ({sent_items} items) to {args.chats} chats "
+            f"in {elapsed:.1f}s: {sent_items / elapsed:.2f} items/s"
+        )
+        print(
+            f"latency mean={statistics.fmean(latencies) if latencies else 0:.2f}s "
+            f"p50={percentile(latencies, 0.5):.2f}s p95={percentile(latencies, 0.95):.2f}s "
+            f"p99={percentile(latencies, 0.99):.2f}s"
+        )
+        print(
+            f"queue: retried={stats.retried} failed={stats.failed} max_wait={stats.max_wait_seconds:.2f}s; "
+            f"uploads={telegram_sender.uploads} reused_file_ids={telegram_sender.reused}; "
+            f"errors: {dict(errors) or 'none'}"
+        )
+        if fake is not None:
+            statuses = {status: count for status, count in fake.statuses.items()}
+            print(
+                f"fake server: methods={dict(fake.methods)} statuses={statuses} "
+                f"uploaded={fake.uploaded_bytes / 1024 / 1024:.1f} MiB"
+            )
+    finally:
+        await sender.close()
+        await bot.session.close()
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
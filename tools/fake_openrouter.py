@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import math
+import random
+import re
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+
+BATCH_MARKER = re.compile(r"^[ \t]*###[ \t]*(\d+)[ \t]*$", re.MULTILINE)
+WORDS = "новость событие рост данные заявил правительство рынок компания город эксперт".split()
+
+
+@dataclass
+class FakeOpenRouterConfig:
+    latency: str = "lognormal"
+    latency_mean: float = 2.0
+    latency_sigma: float = 0.5
+    latency_max: float = 60.0
+    rate_429: float = 0.0
+    rate_5xx: float = 0.0
+    retry_after: float = 1.0
+    response_chars: int = 800
+    max_concurrency: int = 0
+
+
+@dataclass
+class FakeOpenRouterStats:
+    requests: int = 0
+    completed: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+
+class FakeOpenRouter:
+    def __init__(self, config: FakeOpenRouterConfig, seed: int | None = None):
+        self.config = config
+        self.stats = FakeOpenRouterStats()
+        self.random = random.Random(seed)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/chat/completions", self.chat_completions)
+        app.router.add_get("/stats", self.get_stats)
+        return app
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        self.stats.requests += 1
+        if self.config.max_concurrency and self.stats.in_flight >= self.config.max_concurrency:
+            return self._throttled()
+        if self.random.random() < self.config.rate_429:
+            return self._throttled()
+
+        self.stats.in_flight += 1
+        self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+        try:
+            body = await request.json()
+            await asyncio.sleep(self._latency())
+            if self.random.random() < self.config.rate_5xx:
+                self.stats.server_errors += 1
+                return web.json_response({"error": {"message": "upstream error"}}, status=self.random.choice([500, 502, 503]))
+
+            prompt = self._prompt(body)
+            self.stats.completed += 1
+            return web.json_response({
+                "id": f"fake-{self.stats.requests}",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self._content(prompt)}}],
+            })
+        finally:
+            self.stats.in_flight -= 1
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        data = dict(self.stats.__dict__)
+        data["uptime"] = time.monotonic() - data.pop("started_at")
+        return web.json_response(data)
+
+    def _throttled(self) -> web.Response:
+        self.stats.throttled += 1
+        return web.json_response(
+            {"error": {"message": "rate limited"}},
+            status=429,
+            headers={"Retry-After": f"{self.config.retry_after:g}"},
+        )
+
+    def _latency(self) -> float:
+        config = self.config
+        if config.latency == "fixed":
+            value = config.latency_mean
+        elif config.latency == "uniform":
+            value = self.random.uniform(0, 2 * config.latency_mean)
+        elif config.latency == "exponential":
+            value = self.random.expovariate(1 / config.latency_mean) if config.latency_mean > 0 else 0.0
+        else:
+            if config.latency_mean > 0:
+                mu = math.log(config.latency_mean) - config.latency_sigma ** 2 / 2
+                value = self.random.lognormvariate(mu, config.latency_sigma)
+            else:
+                value = 0.0
+        return min(max(0.0, value), config.latency_max)
+
+    def _prompt(self, body: dict) -> str:
+        content = body.get("messages", [{}])[-1].get("content", "")
+        if isinstance(content, list):
+            return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+        return str(content)
+
+    def _content(self, prompt: str) -> str:
+        markers = [int(number) for number in BATCH_MARKER.findall(prompt)]
+        if not markers:
+            return self._text()
+        return "\n\n".join(f"### {number}\n{self._text()}" for number in markers)
+
+    def _text(self) -> str:
+        words = []
+        length = 0
+        while length < self.config.response_chars:
+            word = self.random.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:self.config.response_chars]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenRouter chat/completions endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=2.0, help="mean response latency, seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal shape parameter")
+    parser.add_argument("--latency-max", type=float, default=60.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="fraction of requests answered with 5xx")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with 429, seconds")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="answer 429 above this many in-flight requests")
+    parser.add_argument("--response-chars", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeOpenRouterConfig:
+    return FakeOpenRouterConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        latency_max=args.latency_max,
+        rate_429=args.rate_429,
+        rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after,
+        response_chars=args.response_chars,
+        max_concurrency=args.max_concurrency,
+    )
+
+
+async def start_server(fake: FakeOpenRouter, host: str, port: int) -> web.AppRunner:
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    args = parse_args()
+    fake = FakeOpenRouter(config_from_args(args), seed=args.seed)
+    print(f"Fake OpenRouter listening on http://{args.host}:{args.port}/api/v1")
+    web.run_app(fake.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,360 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+
+BOT_USER_ID = 100000
+PHOTO_SIZES = ((90, 90), (320, 320), (800, 800))
+
+
+@dataclass
+class FakeTelegramConfig:
+    latency: str = "lognormal"
+    latency_mean: float = 0.05
+    latency_sigma: float = 0.5
+    flood_rate: float = 0.0
+    retry_after: int = 3
+    global_limit: float = 30
+    chat_limit: int = 20
+    admins: list[int] = field(default_factory=list)
+    record_file: str | None = None
+    max_records: int = 10000
+
+
+@dataclass
+class RequestRecord:
+    method: str
+    chat_id: int | None
+    status: int
+    latency: float
+    uploaded_bytes: int
+    at: float = field(default_factory=time.time)
+
+
+class FakeTelegram:
+    def __init__(self, config: FakeTelegramConfig, seed: int | None = None):
+        self.config = config
+        self.random = random.Random(seed)
+        self.records: deque[RequestRecord] = deque(maxlen=config.max_records)
+        self.methods: Counter[str] = Counter()
+        self.statuses: Counter[int] = Counter()
+        self.uploaded_bytes = 0
+        self.file_ids: set[str] = set()
+        self.message_ids: Counter[int] = Counter()
+        self.updates: list[dict] = []
+        self.update_id = 0
+        self.new_updates = asyncio.Event()
+        self.global_sends: deque[float] = deque()
+        self.chat_sends: dict[int, deque[float]] = {}
+        self.started_at = time.monotonic()
+        self._record_file = open(config.record_file, "a", encoding="utf-8") if config.record_file else None
+        self.handlers = {
+            "getMe": self.get_me,
+            "deleteWebhook": self.delete_webhook,
+            "getUpdates": self.get_updates,
+            "sendMessage": self.send_message,
+            "sendPhoto": self.send_photo,
+            "sendMediaGroup": self.send_media_group,
+            "editMessageText": self.edit_message_text,
+            "answerCallbackQuery": self.answer_callback_query,
+            "getChatAdministrators": self.get_chat_administrators,
+        }
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/bot{token}/{method}", self.dispatch)
+        app.router.add_post("/_updates", self.inject_update)
+        app.router.add_get("/_stats", self.get_stats)
+        app.router.add_get("/_requests", self.get_requests)
+        app.on_cleanup.append(self._close_record_file)
+        return app
+
+    async def dispatch(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        started_at = time.monotonic()
+        params, uploaded = await self._params(request)
+        chat_id = int(params["chat_id"]) if "chat_id" in params else None
+
+        handler = self.handlers.get(method)
+        if handler is None:
+            status, body = 404, self._error(404, "Not Found: method not found")
+        else:
+            if method != "getUpdates":
+                await asyncio.sleep(self._latency())
+            status, body = self._flood_check(method, chat_id) or await handler(params)
+
+        self.uploaded_bytes += uploaded
+        self._record(RequestRecord(method, chat_id, status, time.monotonic() - started_at, uploaded))
+        return web.json_response(body, status=status)
+
+    async def get_me(self, params: dict) -> tuple[int, dict]:
+        return 200, self._ok(self._bot_user())
+
+    async def delete_webhook(self, params: dict) -> tuple[int, dict]:
+        return 200, self._ok(True)
+
+    async def get_updates(self, params: dict) -> tuple[int, dict]:
+        offset = int(params.get("offset", 0))
+        timeout = float(params.get("timeout", 0))
+        self.updates = [update for update in self.updates if update["update_id"] >= offset]
+        if not self.updates and timeout:
+            self.new_updates.clear()
+            try:
+                await asyncio.wait_for(self.new_updates.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        limit = int(params.get("limit", 100))
+        return 200, self._ok(self.updates[:limit])
+
+    async def send_message(self, params: dict) -> tuple[int, dict]:
+        return 200, self._ok(self._message(int(params["chat_id"]), text=params.get("text", "")))
+
+    async def send_photo(self, params: dict) -> tuple[int, dict]:
+        photo = self._photo(self._attachment(params, params.get("photo")))
+        if photo is None:
+            return 400, self._error(400, "Bad Request: wrong file identifier/HTTP URL specified")
+        return 200, self._ok(self._message(int(params["chat_id"]), caption=params.get("caption"), photo=photo))
+
+    async def send_media_group(self, params: dict) -> tuple[int, dict]:
+        chat_id = int(params["chat_id"])
+        media = json.loads(params.get("media", "[]"))
+        if not 2 <= len(media) <= 10:
+            return 400, self._error(400, "Bad Request: wrong number of media specified")
+
+        messages = []
+        for item in media:
+            photo = self._photo(self._attachment(params, item.get("media")))
+            if photo is None:
+                return 400, self._error(400, "Bad Request: wrong file identifier/HTTP URL specified")
+            messages.append(self._message(chat_id, caption=item.get("caption"), photo=photo))
+        return 200, self._ok(messages)
+
+    async def edit_message_text(self, params: dict) -> tuple[int, dict]:
+        if "chat_id" not in params:
+            return 200, self._ok(True)
+        message = self._message(int(params["chat_id"]), text=params.get("text", ""))
+        message["message_id"] = int(params.get("message_id", message["message_id"]))
+        message["edit_date"] = int(time.time())
+        return 200, self._ok(message)
+
+    async def answer_callback_query(self, params: dict) -> tuple[int, dict]:
+        return 200, self._ok(True)
+
+    async def get_chat_administrators(self, params: dict) -> tuple[int, dict]:
+        admins = [{"status": "creator", "user": self._user(self.config.admins[0]), "is_anonymous": False}] \
+            if self.config.admins else []
+        rights = [
+            "can_manage_chat", "can_delete_messages", "can_manage_video_chats", "can_restrict_members",
+            "can_promote_members", "can_change_info", "can_invite_users", "can_post_stories",
+            "can_edit_stories", "can_delete_stories", "can_post_messages", "can_edit_messages",
+        ]
+        for user in [self._bot_user()] + [self._user(user_id) for user_id in self.config.admins[1:]]:
+            admin = {"status": "administrator", "user": user, "can_be_edited": False, "is_anonymous": False}
+            admin.update({right: True for right in rights})
+            admins.append(admin)
+        return 200, self._ok(admins)
+
+    async def inject_update(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        self.update_id += 1
+        update = {"update_id": self.update_id}
+        user = self._user(int(data.get("from_id", self.config.admins[0] if self.config.admins else 1)))
+        chat = {"id": int(data.get("chat_id", user["id"])), "type": data.get("chat_type", "private")}
+        if "callback_data" in data:
+            update["callback_query"] = {
+                "id": str(self.update_id),
+                "from": user,
+                "chat_instance": str(chat["id"]),
+                "data": data["callback_data"],
+                "message": self._message(chat["id"], text=data.get("text", ""), chat=chat),
+            }
+        elif "text" in data:
+            message = self._message(chat["id"], text=data["text"], chat=chat)
+            message["from"] = user
+            update["message"] = message
+        else:
+            update.update({key: value for key, value in data.items() if key != "update_id"})
+        self.updates.append(update)
+        self.new_updates.set()
+        return web.json_response(update)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        uptime = time.monotonic() - self.started_at
+        return web.json_response({
+            "uptime": uptime,
+            "requests": sum(self.methods.values()),
+            "methods": dict(self.methods),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "uploaded_bytes": self.uploaded_bytes,
+            "chats": len(self.message_ids),
+        })
+
+    async def get_requests(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 100))
+        records = list(self.records)[-limit:]
+        return web.json_response([record.__dict__ for record in records])
+
+    async def _params(self, request: web.Request) -> tuple[dict, int]:
+        params = dict(request.query)
+        uploaded = 0
+        if request.content_type == "application/json":
+            params.update(await request.json())
+        elif request.can_read_body:
+            for key, value in (await request.post()).items():
+                if isinstance(value, web.FileField):
+                    content = value.file.read()
+                    uploaded += len(content)
+                    params[key] = content
+                else:
+                    params[key] = value
+        return params, uploaded
+
+    def _flood_check(self, method: str, chat_id: int | None) -> tuple[int, dict] | None:
+        if not method.startswith("send") or chat_id is None:
+            return None
+        now = time.monotonic()
+        chat_sends = self.chat_sends.setdefault(chat_id, deque())
+        while self.global_sends and now - self.global_sends[0] > 1:
+            self.global_sends.popleft()
+        while chat_sends and now - chat_sends[0] > 60:
+            chat_sends.popleft()
+
+        retry_after = None
+        if self.random.random() < self.config.flood_rate:
+            retry_after = self.config.retry_after
+        elif self.config.global_limit and len(self.global_sends) >= self.config.global_limit:
+            retry_after = 1
+        elif self.config.chat_limit and len(chat_sends) >= self.config.chat_limit:
+            retry_after = max(1, math.ceil(60 - (now - chat_sends[0])))
+        if retry_after is not None:
+            return 429, self._error(429, f"Too Many Requests: retry after {retry_after}", retry_after=retry_after)
+
+        self.global_sends.append(now)
+        chat_sends.append(now)
+        return None
+
+    def _attachment(self, params: dict, reference: str | bytes | None) -> str | bytes | None:
+        if isinstance(reference, str) and reference.startswith("attach://"):
+            return params.get(reference.removeprefix("attach://"))
+        return reference
+
+    def _photo(self, reference: str | bytes | None) -> list[dict] | None:
+        if isinstance(reference, bytes):
+            digest = hashlib.blake2b(reference, digest_size=12).hexdigest()
+            file_id = f"fake-photo-{digest}"
+            self.file_ids.add(file_id)
+        elif reference in self.file_ids:
+            file_id = reference
+        else:
+            return None
+        return [
+            {"file_id": f"{file_id}-{width}", "file_unique_id": f"{file_id[-12:]}{width}", "width": width, "height": height}
+            for width, height in PHOTO_SIZES[:-1]
+        ] + [{"file_id": file_id, "file_unique_id": file_id[-12:], "width": 800, "height": 800}]
+
+    def _message(self, chat_id: int, chat: dict | None = None, **content) -> dict:
+        self.message_ids[chat_id] += 1
+        message = {
+            "message_id": self.message_ids[chat_id],
+            "date": int(time.time()),
+            "chat": chat or {"id": chat_id, "type": "channel" if chat_id < 0 else "private"},
+        }
+        message.update({key: value for key, value in content.items() if value is not None})
+        return message
+
+    def _latency(self) -> float:
+        config = self.config
+        if config.latency_mean <= 0:
+            return 0.0
+        if config.latency == "fixed":
+            return config.latency_mean
+        if config.latency == "uniform":
+            return self.random.uniform(0, 2 * config.latency_mean)
+        mu = math.log(config.latency_mean) - config.latency_sigma ** 2 / 2
+        return self.random.lognormvariate(mu, config.latency_sigma)
+
+    def _record(self, record: RequestRecord):
+        self.records.append(record)
+        self.methods[record.method] += 1
+        self.statuses[record.status] += 1
+        if self._record_file is not None:
+            self._record_file.write(json.dumps(record.__dict__) + "\n")
+
+    async def _close_record_file(self, app: web.Application):
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+
+    def _ok(self, result) -> dict:
+        return {"ok": True, "result": result}
+
+    def _error(self, code: int, description: str, **parameters) -> dict:
+        error = {"ok": False, "error_code": code, "description": description}
+        if parameters:
+            error["parameters"] = parameters
+        return error
+
+    def _bot_user(self) -> dict:
+        user = self._user(BOT_USER_ID)
+        user.update({"is_bot": True, "first_name": "FakeNewsBot", "username": "fake_news_bot"})
+        return user
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8082)
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-mean", type=float, default=0.05, help="mean response latency, seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal shape parameter")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="fraction of sends answered with 429")
+    parser.add_argument("--retry-after", type=int, default=3, help="retry_after for injected 429s, seconds")
+    parser.add_argument("--global-limit", type=float, default=30, help="sends per second before 429, 0 disables")
+    parser.add_argument("--chat-limit", type=int, default=20, help="sends per chat per minute before 429, 0 disables")
+    parser.add_argument("--admins", default="", help="comma-separated user ids returned by getChatAdministrators")
+    parser.add_argument("--record", default=None, help="append every request as JSON lines to this file")
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args(argv)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeTelegramConfig:
+    return FakeTelegramConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        flood_rate=args.flood_rate,
+        retry_after=args.retry_after,
+        global_limit=args.global_limit,
+        chat_limit=args.chat_limit,
+        admins=[int(user_id) for user_id in args.admins.split(",") if user_id.strip()],
+        record_file=args.record,
+    )
+
+
+async def start_server(fake: FakeTelegram, host: str, port: int) -> web.AppRunner:
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    args = parse_args()
+    fake = FakeTelegram(config_from_args(args), seed=args.seed)
+    print(f"Fake Telegram Bot API listening on http://{args.host}:{args.port}")
+    web.run_app(fake.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()